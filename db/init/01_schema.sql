@@ -77,12 +77,51 @@ CREATE TABLE IF NOT EXISTS rps_core.fct_forecast (
     forecast_units NUMERIC(12, 2)
 );
 
+-- Daily stock per product × region (generator/synth.py::inventory_frame)
+CREATE TABLE IF NOT EXISTS rps_core.fct_inventory (
+    inventory_id BIGSERIAL PRIMARY KEY,
+    date_id DATE REFERENCES rps_core.dim_date (date_id),
+    product_id INT REFERENCES rps_core.dim_product (product_id),
+    region_id INT REFERENCES rps_core.dim_region (region_id),
+    demand_units INT,
+    receipts_units INT,
+    on_hand_units INT,
+    on_order_units INT,
+    reorder_point_units INT
+);
+
+-- Generator run instrumentation: one row per stage per run (generator/instrument.py)
+CREATE TABLE IF NOT EXISTS rps_core.load_runs (
+    run_id UUID NOT NULL,
+    started_at TIMESTAMPTZ NOT NULL,
+    scale TEXT,
+    mode TEXT,
+    workers INT,
+    load_connections INT,
+    stage TEXT NOT NULL,
+    wall_s DOUBLE PRECISION,
+    cpu_s DOUBLE PRECISION,
+    rows BIGINT,
+    rows_per_s DOUBLE PRECISION,
+    bytes BIGINT,
+    peak_mb DOUBLE PRECISION,
+    PRIMARY KEY (run_id, stage)
+);
+
+-- Sales trend window of the last full load (one row), so --append and trickle continue it
+CREATE TABLE IF NOT EXISTS rps_core.sales_window (
+    origin DATE NOT NULL,
+    horizon_days INT NOT NULL
+);
+
 -- Helpful indexes
 CREATE INDEX IF NOT EXISTS idx_sales_date ON rps_core.fct_sales (date_id);
 CREATE INDEX IF NOT EXISTS idx_sales_product ON rps_core.fct_sales (product_id);
 CREATE INDEX IF NOT EXISTS idx_sales_region ON rps_core.fct_sales (region_id);
 CREATE INDEX IF NOT EXISTS idx_rebates_date ON rps_core.fct_rebates (date_id);
 CREATE INDEX IF NOT EXISTS idx_rebates_product ON rps_core.fct_rebates (product_id);
+CREATE INDEX IF NOT EXISTS idx_inventory_date ON rps_core.fct_inventory (date_id);
+CREATE INDEX IF NOT EXISTS idx_inventory_product ON rps_core.fct_inventory (product_id);
 
 -- Channels seed
 INSERT INTO rps_core.dim_channel (channel_name)
@@ -0,0 +1,48 @@
+-- dbt/analyses/bench_clean.sql
+-- Time the compiled clean_* functions against the original inline macros on rps_raw.*.
+--   make bench-clean        (after make dbt-run, so the functions are installed)
+-- psql's \timing prints the duration of every statement. Each pair counts the values the
+-- two versions parse; the counts must match, and the mismatch query at the end must be 0.
+\timing on
+
+-- Single worker first: the per-row parsing cost alone
+SET max_parallel_workers_per_gather = 0;
+{% for table, col in [
+    ('sales_raw', 'gross_sales_chf'),
+    ('rebates_raw', 'rebate_chf'),
+    ('promo_raw', 'spend_chf'),
+    ('forecast_raw', 'forecast_units'),
+] %}
+SELECT '{{ table }}' AS tbl, 'clean_date reference' AS variant,
+    COUNT({{ clean_date_reference('date_id') }}) AS parsed
+FROM {{ source('rps_raw', table) }};
+SELECT '{{ table }}' AS tbl, 'clean_date function' AS variant,
+    COUNT({{ clean_date('date_id') }}) AS parsed
+FROM {{ source('rps_raw', table) }};
+SELECT '{{ table }}' AS tbl, 'clean_numeric reference' AS variant,
+    COUNT({{ clean_numeric_reference(col) }}) AS parsed
+FROM {{ source('rps_raw', table) }};
+SELECT '{{ table }}' AS tbl, 'clean_numeric function' AS variant,
+    COUNT({{ clean_numeric(col) }}) AS parsed
+FROM {{ source('rps_raw', table) }};
+{% endfor %}
+
+-- Parallel query: the functions are PARALLEL SAFE, the correlated-subquery macro is not
+RESET max_parallel_workers_per_gather;
+EXPLAIN (ANALYZE, COSTS OFF)
+SELECT COUNT({{ clean_date('date_id') }}), COUNT({{ clean_numeric('gross_sales_chf') }})
+FROM {{ source('rps_raw', 'sales_raw') }};
+SELECT COUNT({{ clean_date('date_id') }}), COUNT({{ clean_numeric('gross_sales_chf') }})
+FROM {{ source('rps_raw', 'sales_raw') }};
+
+-- Both versions must agree on every row
+SELECT
+    COUNT(*) FILTER (
+        WHERE {{ clean_date('date_id') }} IS DISTINCT FROM {{ clean_date_reference('date_id') }}
+    ) AS date_mismatches,
+    COUNT(*) FILTER (
+        WHERE {{ clean_numeric('gross_sales_chf') }}
+            IS DISTINCT FROM {{ clean_numeric_reference('gross_sales_chf') }}
+    ) AS numeric_mismatches,
+    COUNT(*) AS checked
+FROM {{ source('rps_raw', 'sales_raw') }};
@@ -9,6 +9,24 @@
 )
 {%- endmacro %}
 
+{#
+  clean_key:
+  - Dimension keys (product_id, region_id, ...) as INTEGER, parsed once in staging.
+  - NULL for NULL-likes and anything that isn't plain digits.
+#}
+{% macro clean_key(col) -%}
+{{ var('udf_schema') }}.clean_key(({{ col }})::text)
+{%- endmacro %}
+
+{#
+  clean_count:
+  - Counts (units, touchpoints) that went through the numeric messing: parse like
+    clean_numeric, then round to INTEGER ("1,234" / "12.00" / "12,00" all work).
+#}
+{% macro clean_count(col) -%}
+ROUND({{ clean_numeric(col) }})::INTEGER
+{%- endmacro %}
+
 {% macro clean_int(col) -%}
 (
     CASE
@@ -28,8 +46,18 @@
   - Removes spaces and quote-like thousands markers (’, ′, ″, ´).
   - Handles US "1,234.56", EU "1.234,56", integer with separators,
     and simple "1234,56" or "1234.56".
+  - Calls the compiled function from install_clean_functions (macros/functions.sql).
 #}
 {% macro clean_numeric(col) -%}
+{{ var('udf_schema') }}.clean_numeric(({{ col }})::text)
+{%- endmacro %}
+
+{#
+  clean_numeric_reference:
+  - The original inline version of clean_numeric (a correlated subquery per value).
+  - Kept as the reference for tests/assert_clean_numeric_cases.sql and analyses/bench_clean.sql.
+#}
+{% macro clean_numeric_reference(col) -%}
 (
     CASE
         WHEN {{ col }} IS NULL THEN NULL
@@ -93,8 +121,19 @@
              DD.MM.YYYY
              MM/DD/YYYY vs DD/MM/YYYY (auto-choose by first chunk)
              NULL-likes
+  - Calls the compiled function from install_clean_functions (macros/functions.sql);
+    ISO values skip pattern matching.
 #}
 {% macro clean_date(col) -%}
+{{ var('udf_schema') }}.clean_date(({{ col }})::text)
+{%- endmacro %}
+
+{#
+  clean_date_reference:
+  - The original inline version of clean_date (trims and matches up to six times per value).
+  - Kept as the reference for tests/assert_clean_date_cases.sql and analyses/bench_clean.sql.
+#}
+{% macro clean_date_reference(col) -%}
 (
     CASE
         WHEN {{ col }} IS NULL THEN NULL
@@ -0,0 +1,100 @@
+-- dbt/macros/functions.sql
+
+{#
+  install_clean_functions (on-run-start):
+  - Compiled parsers behind the clean_* macros, in var('udf_schema').
+  - IMMUTABLE + PARALLEL SAFE, so staging scans can run as parallel query and
+    the planner may fold constant calls.
+  - Input is trimmed and normalized once per value; the common plain-number
+    case returns before any of the separator patterns are tried.
+#}
+{% macro install_clean_functions() -%}
+{%- set udf = var('udf_schema') -%}
+CREATE SCHEMA IF NOT EXISTS {{ udf }};
+
+-- Same rules as the original clean_numeric CTE chain, checked in the same order:
+-- EU (1.234,56 / 1234,56) wins over US (1,234.56 / 1,234), so '1,234' is 1.234.
+CREATE OR REPLACE FUNCTION {{ udf }}.clean_numeric(raw TEXT)
+RETURNS NUMERIC
+LANGUAGE plpgsql
+IMMUTABLE STRICT PARALLEL SAFE
+AS $fn$
+DECLARE
+    s TEXT := TRIM(raw);
+BEGIN
+    IF UPPER(s) IN ('', 'NULL', 'N/A', 'NA') THEN
+        RETURN NULL;
+    END IF;
+    -- Fast path: plain digits or dot decimal, nothing to normalize
+    IF s ~ '^[-+]?\d+(\.\d+)?$' THEN
+        RETURN s::NUMERIC;
+    END IF;
+    -- Unicode minus (U+2212) to ASCII; drop spaces and quote-like thousands marks
+    s := TRANSLATE(REPLACE(s, '−', '-'), ' ’′″´', '');
+    IF s ~ '^[-+]?\d+(\.\d+)?$' THEN
+        RETURN s::NUMERIC;
+    END IF;
+    IF s ~ '^[-+]?\d{1,3}(\.\d{3})+,\d+$' OR s ~ '^[-+]?\d+,\d+$' THEN
+        RETURN REPLACE(REPLACE(s, '.', ''), ',', '.')::NUMERIC;
+    END IF;
+    IF s ~ '^[-+]?\d{1,3}(,\d{3})+(\.\d+)?$' THEN
+        RETURN REPLACE(s, ',', '')::NUMERIC;
+    END IF;
+    RETURN NULL;
+END
+$fn$;
+
+-- Same formats as the original clean_date macro; anything else is NULL. Dates are built
+-- with make_date (IMMUTABLE), not TO_DATE or a cast (STABLE, DateStyle-dependent).
+CREATE OR REPLACE FUNCTION {{ udf }}.clean_date(raw TEXT)
+RETURNS DATE
+LANGUAGE plpgsql
+IMMUTABLE STRICT PARALLEL SAFE
+AS $fn$
+DECLARE
+    s TEXT := TRIM(raw);
+BEGIN
+    -- Fast path: ISO YYYY-MM-DD, recognised by shape alone (no regex)
+    IF LENGTH(s) = 10 AND SUBSTR(s, 5, 1) = '-' AND SUBSTR(s, 8, 1) = '-'
+        AND TRANSLATE(s, '0123456789', '') = '--' THEN
+        RETURN MAKE_DATE(SUBSTR(s, 1, 4)::INT, SUBSTR(s, 6, 2)::INT, SUBSTR(s, 9, 2)::INT);
+    END IF;
+    -- Every other accepted format is 10 characters too (NULL-likes fall out here)
+    IF LENGTH(s) <> 10 THEN
+        RETURN NULL;
+    END IF;
+    -- 2024/06/23 (or mixed separators)
+    IF s ~ '^\d{4}[-/]\d{2}[-/]\d{2}$' THEN
+        RETURN MAKE_DATE(SUBSTR(s, 1, 4)::INT, SUBSTR(s, 6, 2)::INT, SUBSTR(s, 9, 2)::INT);
+    END IF;
+    -- 23.06.2024
+    IF s ~ '^\d{2}\.\d{2}\.\d{4}$' THEN
+        RETURN MAKE_DATE(SUBSTR(s, 7, 4)::INT, SUBSTR(s, 4, 2)::INT, SUBSTR(s, 1, 2)::INT);
+    END IF;
+    -- 06/13/2024 vs 13/06/2024: a first part above 12 can only be the day
+    IF s ~ '^\d{2}/\d{2}/\d{4}$' THEN
+        IF SUBSTR(s, 1, 2)::INT > 12 THEN
+            RETURN MAKE_DATE(SUBSTR(s, 7, 4)::INT, SUBSTR(s, 4, 2)::INT, SUBSTR(s, 1, 2)::INT);
+        END IF;
+        RETURN MAKE_DATE(SUBSTR(s, 7, 4)::INT, SUBSTR(s, 1, 2)::INT, SUBSTR(s, 4, 2)::INT);
+    END IF;
+    RETURN NULL;
+END
+$fn$;
+
+-- Dimension keys: plain digits only (at most 9, so always an INT); anything else is NULL
+CREATE OR REPLACE FUNCTION {{ udf }}.clean_key(raw TEXT)
+RETURNS INT
+LANGUAGE plpgsql
+IMMUTABLE STRICT PARALLEL SAFE
+AS $fn$
+DECLARE
+    s TEXT := TRIM(raw);
+BEGIN
+    IF s ~ '^\d{1,9}$' THEN
+        RETURN s::INT;
+    END IF;
+    RETURN NULL;
+END
+$fn$;
+{%- endmacro %}
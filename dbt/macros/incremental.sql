@@ -0,0 +1,47 @@
+-- dbt/macros/incremental.sql
+
+{#
+  raw_watermark:
+  - WHERE clause for incremental staging models over rps_raw.*: only rows that
+    arrived after the newest raw_ingest_ts already in {{ this }}.
+  - Goes back var('stg_lookback') before that, to catch rows whose transaction
+    started (raw_ingest_ts defaults to now()) before the last run but committed
+    after it. Rows seen twice are replaced, not duplicated, via the model's unique_key.
+  - Served by the ix_*_raw_ingest_ts indexes in db/init/02_raw_schema.sql; on a
+    full refresh (or the first run) it renders nothing.
+  - keyword='AND' appends it to a WHERE clause the model already has.
+#}
+{% macro raw_watermark(ts_col='raw_ingest_ts', keyword='WHERE') -%}
+{%- if is_incremental() %}
+{{ keyword }} {{ ts_col }} > (
+    SELECT COALESCE(MAX({{ ts_col }}), '-infinity'::TIMESTAMPTZ) - INTERVAL '{{ var("stg_lookback") }}'
+    FROM {{ this }}
+)
+{%- endif %}
+{%- endmacro %}
+
+{#
+  business_key:
+  - One text key per record, for latest-wins dedupe and as the staging unique_key.
+  - Only a complete key identifies a record. A row with an unparseable or missing key
+    part falls back to its own raw_id, so it is kept as-is and never merged with others.
+#}
+{% macro business_key(cols) -%}
+CASE
+    WHEN {% for col in cols %}{{ col }} IS NOT NULL{% if not loop.last %} AND {% endif %}{% endfor %}
+        THEN CONCAT_WS('|', {{ cols | join(', ') }})
+    ELSE 'raw:' || raw_id
+END
+{%- endmacro %}
+
+{#
+  latest_wins:
+  - Ranks rows within the current batch only (everything past the watermark), newest
+    raw_ingest_ts first, with raw_id as the tie-break for rows from the same load.
+  - Across runs, delete+insert on business_key replaces the staged row. The batch always
+    includes any staged row from the lookback window, so a re-read older copy never beats
+    a newer one. History is never re-sorted.
+#}
+{% macro latest_wins(key='business_key') -%}
+ROW_NUMBER() OVER (PARTITION BY {{ key }} ORDER BY raw_ingest_ts DESC, raw_id DESC)
+{%- endmacro %}
@@ -0,0 +1,27 @@
+-- dbt/macros/quarantine.sql
+
+{#
+  fk_joins / reject_reason:
+  - fks is a list of (column, rps_core dimension) pairs; each dimension is keyed by the
+    column of the same name.
+  - fk_joins LEFT JOINs every dimension onto `rel` (small integer keys: hash joins).
+  - reject_reason is NULL for a conformant row, else the first failed check:
+      invalid_<col>  key missing or unparseable
+      unknown_<col>  parsed, but not in the dimension (dangling FK)
+#}
+{% macro fk_joins(fks, rel) -%}
+{%- for col, dim in fks %}
+LEFT JOIN {{ source('rps_core', dim) }} AS {{ dim }} ON {{ rel }}.{{ col }} = {{ dim }}.{{ col }}
+{%- endfor %}
+{%- endmacro %}
+
+{% macro reject_reason(fks, rel) -%}
+CASE
+    {%- for col, dim in fks %}
+    WHEN {{ rel }}.{{ col }} IS NULL THEN 'invalid_{{ col }}'
+    {%- endfor %}
+    {%- for col, dim in fks %}
+    WHEN {{ dim }}.{{ col }} IS NULL THEN 'unknown_{{ col }}'
+    {%- endfor %}
+END
+{%- endmacro %}
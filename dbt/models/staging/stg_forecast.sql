@@ -1,25 +1,30 @@
-{{ config(materialized='view') }}
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='business_key',
+        indexes=[
+            {'columns': ['business_key'], 'unique': True},
+            {'columns': ['raw_ingest_ts']},
+        ],
+    )
+}}
 
-WITH src AS (
-    SELECT
-        {{ clean_date('date_id') }} AS date_id,
-        {{ clean_text('product_id') }} AS product_id,
-        {{ clean_text('region_id') }} AS region_id,
-        {{ clean_numeric('baseline_units') }} AS baseline_units,
-        {{ clean_numeric('uplift_units') }} AS uplift_units,
-        {{ clean_numeric('forecast_units') }} AS forecast_units
-    FROM {{ source('rps_raw', 'forecast_raw') }}
-),
-
-final AS (
+-- Conformant rows only: integer keys that all resolve to rps_core dimensions
+WITH final AS (
     SELECT
+        business_key,
+        raw_id,
         date_id,
         product_id,
         region_id,
         baseline_units,
         uplift_units,
-        forecast_units
-    FROM src
+        forecast_units,
+        raw_ingest_ts
+    FROM {{ ref('stg_forecast_checked') }}
+    WHERE reject_reason IS NULL
+    {{ raw_watermark(keyword='AND') }}
 )
 
 SELECT * FROM final
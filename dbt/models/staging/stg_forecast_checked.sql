@@ -0,0 +1,66 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='business_key',
+        indexes=[
+            {'columns': ['business_key'], 'unique': True},
+            {'columns': ['raw_ingest_ts']},
+        ],
+    )
+}}
+
+{% set fks = [
+    ('date_id', 'dim_date'),
+    ('product_id', 'dim_product'),
+    ('region_id', 'dim_region'),
+] %}
+
+-- Every deduped raw row with typed keys and its reject_reason (NULL = conformant);
+-- stg_forecast and stg_forecast_quarantine split it.
+WITH src AS (
+    SELECT
+        raw_id,
+        raw_ingest_ts,
+        {{ clean_date('date_id') }} AS date_id,
+        {{ clean_key('product_id') }} AS product_id,
+        {{ clean_key('region_id') }} AS region_id,
+        {{ clean_numeric('baseline_units') }} AS baseline_units,
+        {{ clean_numeric('uplift_units') }} AS uplift_units,
+        {{ clean_numeric('forecast_units') }} AS forecast_units
+    FROM {{ source('rps_raw', 'forecast_raw') }}
+    {{ raw_watermark() }}
+),
+
+keyed AS (
+    SELECT
+        *,
+        {{ business_key(['date_id', 'product_id', 'region_id']) }} AS business_key
+    FROM src
+),
+
+latest AS (
+    SELECT
+        *,
+        {{ latest_wins() }} AS _rn
+    FROM keyed
+),
+
+final AS (
+    SELECT
+        latest.business_key,
+        latest.raw_id,
+        latest.date_id,
+        latest.product_id,
+        latest.region_id,
+        latest.baseline_units,
+        latest.uplift_units,
+        latest.forecast_units,
+        {{ reject_reason(fks, 'latest') }} AS reject_reason,
+        latest.raw_ingest_ts
+    FROM latest
+    {{ fk_joins(fks, 'latest') }}
+    WHERE latest._rn = 1
+)
+
+SELECT * FROM final
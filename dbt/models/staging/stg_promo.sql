@@ -1,25 +1,30 @@
-{{ config(materialized='view') }}
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='business_key',
+        indexes=[
+            {'columns': ['business_key'], 'unique': True},
+            {'columns': ['raw_ingest_ts']},
+        ],
+    )
+}}
 
-WITH src AS (
-    SELECT
-        {{ clean_date('date_id') }} AS date_id,
-        {{ clean_text('product_id') }} AS product_id,
-        {{ clean_text('region_id') }} AS region_id,
-        {{ clean_text('channel_id') }} AS channel_id,
-        {{ clean_numeric('spend_chf') }} AS spend_chf,
-        {{ clean_text('touchpoints') }} AS touchpoints
-    FROM {{ source('rps_raw', 'promo_raw') }}
-),
-
-final AS (
+-- Conformant rows only: integer keys that all resolve to rps_core dimensions
+WITH final AS (
     SELECT
+        business_key,
+        raw_id,
         date_id,
         product_id,
         region_id,
         channel_id,
         spend_chf,
-        touchpoints
-    FROM src
+        touchpoints,
+        raw_ingest_ts
+    FROM {{ ref('stg_promo_checked') }}
+    WHERE reject_reason IS NULL
+    {{ raw_watermark(keyword='AND') }}
 )
 
 SELECT * FROM final
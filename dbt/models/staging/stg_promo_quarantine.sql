@@ -0,0 +1,31 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='business_key',
+        indexes=[
+            {'columns': ['business_key'], 'unique': True},
+            {'columns': ['raw_ingest_ts']},
+        ],
+    )
+}}
+
+-- Rows held back from stg_promo, with the first failed key check (see macros/quarantine.sql)
+WITH final AS (
+    SELECT
+        business_key,
+        raw_id,
+        date_id,
+        product_id,
+        region_id,
+        channel_id,
+        spend_chf,
+        touchpoints,
+        reject_reason,
+        raw_ingest_ts
+    FROM {{ ref('stg_promo_checked') }}
+    WHERE reject_reason IS NOT NULL
+    {{ raw_watermark(keyword='AND') }}
+)
+
+SELECT * FROM final
@@ -1,23 +1,29 @@
-{{ config(materialized='view') }}
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='business_key',
+        indexes=[
+            {'columns': ['business_key'], 'unique': True},
+            {'columns': ['raw_ingest_ts']},
+        ],
+    )
+}}
 
-WITH src AS (
-    SELECT
-        {{ clean_date('date_id') }} AS date_id,
-        {{ clean_text('product_id') }} AS product_id,
-        {{ clean_text('payer_id') }} AS payer_id,
-        {{ clean_text('region_id') }} AS region_id,
-        {{ clean_numeric('rebate_chf') }} AS rebate_chf
-    FROM {{ source('rps_raw', 'rebates_raw') }}
-),
-
-final AS (
+-- Conformant rows only: integer keys that all resolve to rps_core dimensions
+WITH final AS (
     SELECT
+        business_key,
+        raw_id,
         date_id,
         product_id,
-        payer_id,
         region_id,
-        rebate_chf
-    FROM src
+        payer_id,
+        rebate_chf,
+        raw_ingest_ts
+    FROM {{ ref('stg_rebates_checked') }}
+    WHERE reject_reason IS NULL
+    {{ raw_watermark(keyword='AND') }}
 )
 
 SELECT * FROM final
@@ -0,0 +1,65 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='business_key',
+        indexes=[
+            {'columns': ['business_key'], 'unique': True},
+            {'columns': ['raw_ingest_ts']},
+        ],
+    )
+}}
+
+{% set fks = [
+    ('date_id', 'dim_date'),
+    ('product_id', 'dim_product'),
+    ('region_id', 'dim_region'),
+    ('payer_id', 'dim_payer'),
+] %}
+
+-- Every deduped raw row with typed keys and its reject_reason (NULL = conformant);
+-- stg_rebates and stg_rebates_quarantine split it.
+WITH src AS (
+    SELECT
+        raw_id,
+        raw_ingest_ts,
+        {{ clean_date('date_id') }} AS date_id,
+        {{ clean_key('product_id') }} AS product_id,
+        {{ clean_key('region_id') }} AS region_id,
+        {{ clean_key('payer_id') }} AS payer_id,
+        {{ clean_numeric('rebate_chf') }} AS rebate_chf
+    FROM {{ source('rps_raw', 'rebates_raw') }}
+    {{ raw_watermark() }}
+),
+
+keyed AS (
+    SELECT
+        *,
+        {{ business_key(['date_id', 'product_id', 'region_id', 'payer_id']) }} AS business_key
+    FROM src
+),
+
+latest AS (
+    SELECT
+        *,
+        {{ latest_wins() }} AS _rn
+    FROM keyed
+),
+
+final AS (
+    SELECT
+        latest.business_key,
+        latest.raw_id,
+        latest.date_id,
+        latest.product_id,
+        latest.region_id,
+        latest.payer_id,
+        latest.rebate_chf,
+        {{ reject_reason(fks, 'latest') }} AS reject_reason,
+        latest.raw_ingest_ts
+    FROM latest
+    {{ fk_joins(fks, 'latest') }}
+    WHERE latest._rn = 1
+)
+
+SELECT * FROM final
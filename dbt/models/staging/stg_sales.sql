@@ -1,27 +1,31 @@
-{{ config(materialized='view') }}
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='business_key',
+        indexes=[
+            {'columns': ['business_key'], 'unique': True},
+            {'columns': ['raw_ingest_ts']},
+        ],
+    )
+}}
 
-WITH src AS (
-    SELECT
-        {{ clean_date('date_id') }} AS date_id,
-        {{ clean_text('product_id') }} AS product_id,
-        {{ clean_text('region_id') }} AS region_id,
-        {{ clean_text('channel_id') }} AS channel_id,
-        {{ clean_int('units') }} AS units,
-        {{ clean_numeric('list_price_chf') }} AS list_price_chf,
-        {{ clean_numeric('gross_sales_chf') }} AS gross_sales_chf
-    FROM {{ source('rps_raw', 'sales_raw') }}
-),
-
-final AS (
+-- Conformant rows only: integer keys that all resolve to rps_core dimensions
+WITH final AS (
     SELECT
+        business_key,
+        raw_id,
         date_id,
         product_id,
         region_id,
         channel_id,
         units,
         list_price_chf,
-        gross_sales_chf
-    FROM src
+        gross_sales_chf,
+        raw_ingest_ts
+    FROM {{ ref('stg_sales_checked') }}
+    WHERE reject_reason IS NULL
+    {{ raw_watermark(keyword='AND') }}
 )
 
 SELECT * FROM final
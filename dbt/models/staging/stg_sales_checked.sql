@@ -0,0 +1,69 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='business_key',
+        indexes=[
+            {'columns': ['business_key'], 'unique': True},
+            {'columns': ['raw_ingest_ts']},
+        ],
+    )
+}}
+
+{% set fks = [
+    ('date_id', 'dim_date'),
+    ('product_id', 'dim_product'),
+    ('region_id', 'dim_region'),
+    ('channel_id', 'dim_channel'),
+] %}
+
+-- Every deduped raw row with typed keys and its reject_reason (NULL = conformant);
+-- stg_sales and stg_sales_quarantine split it.
+WITH src AS (
+    SELECT
+        raw_id,
+        raw_ingest_ts,
+        {{ clean_date('date_id') }} AS date_id,
+        {{ clean_key('product_id') }} AS product_id,
+        {{ clean_key('region_id') }} AS region_id,
+        {{ clean_key('channel_id') }} AS channel_id,
+        {{ clean_count('units') }} AS units,
+        {{ clean_numeric('list_price_chf') }} AS list_price_chf,
+        {{ clean_numeric('gross_sales_chf') }} AS gross_sales_chf
+    FROM {{ source('rps_raw', 'sales_raw') }}
+    {{ raw_watermark() }}
+),
+
+keyed AS (
+    SELECT
+        *,
+        {{ business_key(['date_id', 'product_id', 'region_id', 'channel_id']) }} AS business_key
+    FROM src
+),
+
+latest AS (
+    SELECT
+        *,
+        {{ latest_wins() }} AS _rn
+    FROM keyed
+),
+
+final AS (
+    SELECT
+        latest.business_key,
+        latest.raw_id,
+        latest.date_id,
+        latest.product_id,
+        latest.region_id,
+        latest.channel_id,
+        latest.units,
+        latest.list_price_chf,
+        latest.gross_sales_chf,
+        {{ reject_reason(fks, 'latest') }} AS reject_reason,
+        latest.raw_ingest_ts
+    FROM latest
+    {{ fk_joins(fks, 'latest') }}
+    WHERE latest._rn = 1
+)
+
+SELECT * FROM final
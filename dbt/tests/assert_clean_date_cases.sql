@@ -0,0 +1,16 @@
+-- Regression fixture for clean_date: every input in seeds/clean_date_cases.csv must parse
+-- to its expected date, through both the compiled function and the original inline macro.
+-- Returns the offending rows (a passing test returns none).
+WITH cases AS (
+    SELECT
+        raw,
+        expected,
+        {{ clean_date('raw') }} AS parsed,
+        {{ clean_date_reference('raw') }} AS reference
+    FROM {{ ref('clean_date_cases') }}
+)
+
+SELECT *
+FROM cases
+WHERE parsed IS DISTINCT FROM expected
+   OR reference IS DISTINCT FROM expected
@@ -0,0 +1,16 @@
+-- Regression fixture for clean_numeric: every messy input in seeds/clean_numeric_cases.csv
+-- must parse to its expected value, through both the compiled function and the original
+-- inline macro. Returns the offending rows (a passing test returns none).
+WITH cases AS (
+    SELECT
+        raw,
+        expected,
+        {{ clean_numeric('raw') }} AS parsed,
+        {{ clean_numeric_reference('raw') }} AS reference
+    FROM {{ ref('clean_numeric_cases') }}
+)
+
+SELECT *
+FROM cases
+WHERE parsed IS DISTINCT FROM expected
+   OR reference IS DISTINCT FROM expected
@@ -0,0 +1,201 @@
+# generator/bench.py
+# Stage benchmarks for the synthesis path — no database needed.
+#
+#   python bench.py                                # every profile in scales.toml
+#   python bench.py --profiles small medium --out bench.json
+#   python bench.py --baseline bench.json          # exit 1 on regressions
+import argparse
+import json
+import platform
+import sys
+import time
+import tomllib
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from generate import SCALE_FILE, SEED, build_dims, frame_jobs, load_scale, product_frames
+
+
+class StageClock:
+    """timer() hook for product_frames: sums seconds and keeps the peak MB per stage."""
+
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+        self.seconds: dict[str, float] = defaultdict(float)
+        self.peak_mb: dict[str, float] = defaultdict(float)
+
+    @contextmanager
+    def __call__(self, stage: str):
+        if self.memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[stage] += time.perf_counter() - t0
+            if self.memory:
+                peak = (tracemalloc.get_traced_memory()[1] - base) / 1e6
+                self.peak_mb[stage] = max(self.peak_mb[stage], peak)
+
+
+def run_stages(
+    dims: dict, profile: dict, seed: int, clock: StageClock, keep: list | None = None
+) -> dict[str, int]:
+    """Run every product chunk in-process through `clock`; returns rows per stage.
+
+    Pass `keep` to hold on to the frames (as a batch load does) for memory accounting.
+    """
+    ctx, jobs = frame_jobs(dims, profile, seed)
+    rows: dict[str, int] = defaultdict(int)
+    for products, child in jobs:
+        frames = product_frames(ctx, products, child, timer=clock)
+        for table, df in frames.items():
+            rows[table] += len(df)
+        if keep is not None:
+            keep.append(frames)
+    return rows
+
+
+def bench_profile(name: str, profile: dict, seed: int, products: int, repeat: int) -> dict:
+    """Best-of-`repeat` seconds per stage, plus tracemalloc peak from a separate pass.
+
+    Memory is traced in its own run: tracemalloc slows object-heavy stages (the messy
+    TEXT layers) by several times, which would swamp the timings.
+    """
+    if products:
+        profile = {**profile, "products": min(products, profile["products"])}
+    dims = build_dims(profile)
+
+    best: dict[str, float] = {}
+    for _ in range(repeat):
+        clock = StageClock()
+        rows = run_stages(dims, profile, seed, clock)
+        for stage, s in clock.seconds.items():
+            best[stage] = min(best.get(stage, s), s)
+
+    clock = StageClock(memory=True)
+    kept: list = []
+    tracemalloc.start()
+    try:
+        run_stages(dims, profile, seed, clock, keep=kept)
+        # what a batch (non-stream) load holds in memory before COPY
+        retained_mb = tracemalloc.get_traced_memory()[0] / 1e6
+    finally:
+        tracemalloc.stop()
+    del kept
+
+    stages = {
+        stage: {
+            "seconds": round(best[stage], 4),
+            "rows": rows[stage],
+            "rows_per_s": round(rows[stage] / best[stage]) if best[stage] else None,
+            "peak_mb": round(clock.peak_mb[stage], 1),
+        }
+        for stage in best
+    }
+    total = sum(best.values())
+    # Progress goes to stderr so stdout stays valid JSON
+    print(
+        f"{name}: {profile['products']} product(s), {total:.2f}s total, "
+        f"{retained_mb:.1f} MB of frames held",
+        file=sys.stderr,
+    )
+    for stage, st in stages.items():
+        print(
+            f"  {stage:<22} {st['seconds']:>8.3f}s {st['rows']:>11,} rows "
+            f"{st['rows_per_s'] or 0:>12,} rows/s {st['peak_mb']:>9.1f} MB peak",
+            file=sys.stderr,
+        )
+    return {
+        "products": profile["products"],
+        "seconds": round(total, 4),
+        "retained_mb": round(retained_mb, 1),
+        "stages": stages,
+    }
+
+
+def regressions(report: dict, baseline: dict, max_slowdown: float) -> list[str]:
+    """Stages whose time or peak memory grew beyond `max_slowdown` × the baseline."""
+    found = []
+    for name, prof in report["profiles"].items():
+        base = baseline.get("profiles", {}).get(name)
+        if not base or base["products"] != prof["products"]:
+            continue
+        old_mb, new_mb = base.get("retained_mb"), prof["retained_mb"]
+        if old_mb and new_mb > old_mb * max_slowdown:
+            found.append(f"{name} retained_mb: {old_mb} -> {new_mb} (x{new_mb / old_mb:.2f})")
+        for stage, st in prof["stages"].items():
+            old = base["stages"].get(stage)
+            if not old:
+                continue
+            for key in ("seconds", "peak_mb"):
+                if old[key] and st[key] > old[key] * max_slowdown:
+                    found.append(
+                        f"{name} {stage} {key}: {old[key]} -> {st[key]} (x{st[key] / old[key]:.2f})"
+                    )
+    return found
+
+
+def main(argv: list[str] | None = None) -> int:
+    with open(SCALE_FILE, "rb") as f:
+        all_profiles = list(tomllib.load(f))
+    parser = argparse.ArgumentParser(description="Benchmark synthesis stages per scale profile.")
+    parser.add_argument("--profiles", nargs="+", default=all_profiles, choices=all_profiles)
+    parser.add_argument(
+        "--products",
+        type=int,
+        default=8,
+        help="cap products per profile (0 = all); stage cost is linear in products",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs; best one is kept")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument(
+        "--max-slowdown",
+        type=float,
+        default=1.25,
+        help="flag a stage when seconds or peak MB exceed baseline × this",
+    )
+    args = parser.parse_args(argv)
+
+    report = {
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "profiles": {},
+    }
+    bench = partial(bench_profile, seed=args.seed, products=args.products, repeat=args.repeat)
+    for name in args.profiles:
+        report["profiles"][name] = bench(name, load_scale(name))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.out}")
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(report, json.load(f), args.max_slowdown)
+        for line in found:
+            print("REGRESSION", line, file=sys.stderr)
+        if found:
+            return 1
+        print(f"No stage slower than x{args.max_slowdown} of {args.baseline}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,31 @@
+import argparse
+import json
 import os
 import time
+import tomllib
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+
 import numpy as np
 import pandas as pd
 import psycopg2
 import sqlalchemy as sa
 
-# after existing imports:
-from messy import (
-    as_text,
-    add_lineage,
-    messy_numeric,
-    messy_dates,
-    inject_dupes,
-    inject_fk_breaks,
+from instrument import Recorder, print_report, save_report, write_report
+from loader import BulkLoad, ParallelLoader, copy_frame
+from messy import MessPipeline
+from sink import FileSink
+from synth import (
+    INVENTORY_WINDOW,
+    forecast_frame,
+    inventory_frame,
+    promo_frame,
+    rebates_frame,
+    sales_frame,
+    series_prices,
 )
 
 WRITE_RAW = os.getenv("WRITE_RAW", "1") == "1"
@@ -21,7 +34,15 @@ MESS_RATE_TYPES = float(os.getenv("MESS_RATE_TYPES", "0.15"))
 MESS_RATE_DATES = float(os.getenv("MESS_RATE_DATES", "0.08"))
 MESS_RATE_FK_BREAKS = float(os.getenv("MESS_RATE_FK_BREAKS", "0.02"))
 MESS_RATE_DUPES = float(os.getenv("MESS_RATE_DUPES", "0.02"))
-RAW_RNG = np.random.default_rng(20250813)
+SEED = int(os.getenv("SEED", "42"))
+PAYER_SHARES = os.getenv("PAYER_SHARES", "")
+PROMO_CAMPAIGN_RATE = float(os.getenv("PROMO_CAMPAIGN_RATE", str(1 / 45)))
+PROMO_CAMPAIGN_DAYS = int(os.getenv("PROMO_CAMPAIGN_DAYS", "14"))
+BULK_LOAD = os.getenv("BULK_LOAD", "0") == "1"
+BULK_UNLOGGED_RAW = os.getenv("BULK_UNLOGGED_RAW", "0") == "1"
+RUN_REPORT = os.getenv("RUN_REPORT", "")
+RUN_REPORT_DB = os.getenv("RUN_REPORT_DB", "0") == "1"
+RUN_TRACE_MEMORY = os.getenv("RUN_TRACE_MEMORY", "0") == "1"
 
 
 DB = os.getenv("POSTGRES_DB", "rps")
@@ -30,28 +51,58 @@ PWD = os.getenv("POSTGRES_PASSWORD", "rps_password")
 HOST = os.getenv("POSTGRES_HOST", "postgres")
 PORT = int(os.getenv("POSTGRES_PORT", "5432"))
 SCALE = os.getenv("SCALE", "small").lower()
+# `or`, not a getenv default: compose passes `SCALE_FILE=` through as an empty string
+SCALE_FILE = os.getenv("SCALE_FILE") or os.path.join(os.path.dirname(__file__), "scales.toml")
 TZ = os.getenv("TZ", "Europe/Zurich")
-
-
-# Add a helper to copy to rps_raw.* (TEXT tables)
-def copy_df_raw(conn, df: pd.DataFrame, table: str):
-    cols = ", ".join(df.columns)
-    path = f"/tmp/{table.replace('.', '_')}.csv"
-    df.to_csv(path, index=False, header=False)
-    with conn.cursor() as cur:
-        cur.execute(f"TRUNCATE TABLE {table} RESTART IDENTITY;")
-        with open(path, "r") as fh:
-            cur.copy_expert(f"COPY {table} ({cols}) FROM STDIN WITH (FORMAT CSV)", fh)
-    print(f"Loaded {table}: {len(df)}")
+SOURCES = os.getenv("SOURCES", "")
+DEFAULT_SOURCES_FILE = os.path.join(os.path.dirname(__file__), "sources.toml")
+SOURCES_FILE = os.getenv("SOURCES_FILE") or DEFAULT_SOURCES_FILE
+
+
+def load_payer_shares(path: str) -> dict | None:
+    """Read the optional canton -> {payer_name: weight} JSON used for the rebate payer mix."""
+    if not path:
+        return None
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def load_scale(name: str, path: str = SCALE_FILE) -> dict:
+    """Return the named profile from the scale file (see scales.toml for the keys)."""
+    with open(path, "rb") as fh:
+        profiles = tomllib.load(fh)
+    if name not in profiles:
+        raise ValueError(f"Unknown SCALE={name!r}; choose one of {', '.join(profiles)}")
+    return profiles[name]
+
+
+def load_sources(names: list[str], path: str = SOURCES_FILE) -> list[dict]:
+    """Source-system specs (see sources.toml); unlisted names are plain single feeds.
+
+    Only the bundled default may be absent; an explicitly chosen file has to exist.
+    """
+    known = {}
+    if os.path.exists(path):
+        with open(path, "rb") as fh:
+            known = tomllib.load(fh)
+    elif path != DEFAULT_SOURCES_FILE:
+        raise FileNotFoundError(f"SOURCES_FILE={path!r} does not exist")
+    specs = [{"weight": 1.0, **known.get(name, {}), "name": name} for name in names]
+    sent = {t for spec in specs for t in spec.get("tables", RAW_STEMS)}
+    unfed = [t for t in RAW_STEMS if t not in sent]
+    if unfed:
+        raise ValueError(
+            f"No source in {', '.join(names)} sends {', '.join(unfed)}; "
+            "add one that does (see sources.toml)"
+        )
+    return specs
 
 
 def connect():
     """Connect to Postgres with retries; set timezone and search_path."""
     for _ in range(40):
         try:
-            conn = psycopg2.connect(
-                dbname=DB, user=USER, password=PWD, host=HOST, port=PORT
-            )
+            conn = psycopg2.connect(dbname=DB, user=USER, password=PWD, host=HOST, port=PORT)
             conn.autocommit = True
             with conn.cursor() as cur:
                 cur.execute("SET TIME ZONE %s;", (TZ,))
@@ -68,16 +119,8 @@ def connect_engine():
     return sa.create_engine(url)
 
 
-def seed_dates(conn):
-    import pandas as pd
-
-    TZ = "Europe/Zurich"
-
-    # Today in Zurich, then make it naïve (no tz) for storage
-    today = pd.Timestamp.now(tz=TZ).normalize().tz_localize(None)
-    start = (today - pd.DateOffset(years=3)).replace(day=1)  # 3-year spine
-    end = today
-
+def date_frame(start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    """dim_date rows for every day in [start, end]."""
     # Daily spine
     days = pd.date_range(start, end, freq="D")  # datetime64[ns], naïve
     df = pd.DataFrame({"date_id": days})
@@ -93,27 +136,46 @@ def seed_dates(conn):
 
     # Store date_id as DATE (not timestamp)
     df["date_id"] = df["date_id"].dt.date
+    return df[["date_id", "year", "month", "week", "month_start", "week_start"]]
+
+
+def today_local() -> pd.Timestamp:
+    # Today in Zurich, then make it naïve (no tz) for storage
+    return pd.Timestamp.now(tz=TZ).normalize().tz_localize(None)
+
+
+def date_spine(years: int = 3, today: pd.Timestamp | None = None) -> pd.DataFrame:
+    today = today if today is not None else today_local()
+    start = (today - pd.DateOffset(years=years)).replace(day=1)  # N-year spine
+    return date_frame(start, today)
+
+
+def seed_dates(conn, years: int = 3):
+    df = date_spine(years)
 
     with conn.cursor() as cur:
         # Clear dim and anything depending on it (facts) to avoid FK errors
         cur.execute("TRUNCATE TABLE rps_core.dim_date RESTART IDENTITY CASCADE;")
-        path = "/tmp/dim_date.csv"
-        # Order must match COPY column list below
-        df[["date_id", "year", "month", "week", "month_start", "week_start"]].to_csv(
-            path, index=False, header=False, date_format="%Y-%m-%d"
-        )
-        with open(path, "r") as fh:
-            cur.copy_expert(
-                """
-                COPY rps_core.dim_date (date_id, year, month, week, month_start, week_start)
-                FROM STDIN WITH (FORMAT CSV)
-                """,
-                fh,
-            )
+    copy_frame(conn, df, "rps_core.dim_date", quiet=True)
     print(f"Seeded dim_date: {len(df)}")
+    return len(df)
 
 
-def seed_regions(conn):
+def extend_dates(conn):
+    """Append the days between the last dim_date row and today (append mode)."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT max(date_id) FROM rps_core.dim_date;")
+        last = cur.fetchone()[0]
+    if last is None:
+        raise RuntimeError("dim_date is empty; run a full load before --append")
+    df = date_frame(pd.Timestamp(last) + pd.Timedelta(days=1), today_local())
+    if len(df):
+        copy_frame(conn, df, "rps_core.dim_date", quiet=True)
+    print(f"Extended dim_date: +{len(df)}")
+    return len(df)
+
+
+def region_frame() -> pd.DataFrame:
     cantons = [
         ("ZH", "Deutschschweiz"),
         ("BE", "Deutschschweiz"),
@@ -142,20 +204,35 @@ def seed_regions(conn):
         ("GE", "Romandie"),
         ("JU", "Romandie"),
     ]
-    df = pd.DataFrame(cantons, columns=["canton", "language_region"])
+    return pd.DataFrame(cantons, columns=["canton", "language_region"])
+
+
+def seed_regions(conn):
+    df = region_frame()
     with conn.cursor() as cur:
         cur.execute("TRUNCATE TABLE rps_core.dim_region RESTART IDENTITY CASCADE;")
-        path = "/tmp/dim_region.csv"
-        df.to_csv(path, index=False, header=False)
-        with open(path, "r") as fh:
-            cur.copy_expert(
-                "COPY rps_core.dim_region (canton, language_region) FROM STDIN WITH (FORMAT CSV)",
-                fh,
-            )
+    copy_frame(conn, df, "rps_core.dim_region", quiet=True)
     print("Seeded dim_region:", len(df))
-
-
-def seed_payers(conn):
+    return len(df)
+
+
+EXTRA_PAYERS = [
+    "Assura",
+    "Atupri",
+    "Sympany",
+    "EGK",
+    "ÖKK",
+    "Aquilana",
+    "Agrisano",
+    "Galenos",
+    "SLKK",
+    "Sodalis",
+    "Rhenusana",
+    "Vivao",
+]
+
+
+def payer_frame(n: int = 8) -> pd.DataFrame:
     payers = [
         ("Helsana", "Insurer"),
         ("CSS", "Insurer"),
@@ -166,20 +243,21 @@ def seed_payers(conn):
         ("KPT", "Insurer"),
         ("Visana", "Insurer"),
     ]
-    df = pd.DataFrame(payers, columns=["payer_name", "payer_type"])
+    payers += [(name, "Insurer") for name in EXTRA_PAYERS]
+    payers += [(f"Payer {i + 1:02d}", "Insurer") for i in range(len(payers), n)]
+    return pd.DataFrame(payers[:n], columns=["payer_name", "payer_type"])
+
+
+def seed_payers(conn, n: int = 8):
+    df = payer_frame(n)
     with conn.cursor() as cur:
         cur.execute("TRUNCATE TABLE rps_core.dim_payer RESTART IDENTITY CASCADE;")
-        path = "/tmp/dim_payer.csv"
-        df.to_csv(path, index=False, header=False)
-        with open(path, "r") as fh:
-            cur.copy_expert(
-                "COPY rps_core.dim_payer (payer_name, payer_type) FROM STDIN WITH (FORMAT CSV)",
-                fh,
-            )
+    copy_frame(conn, df, "rps_core.dim_payer", quiet=True)
     print("Seeded dim_payer:", len(df))
+    return len(df)
 
 
-def seed_products(conn):
+def product_frame(n: int = 8, launch_months: tuple[int, int] = (12, 36)) -> pd.DataFrame:
     brands = [
         ("Avalimab", "avalimumab", "L04A", "Oncology"),
         ("Rimuxen", "rituximab", "L01X", "Oncology"),
@@ -193,317 +271,654 @@ def seed_products(conn):
     rows = []
     today = pd.Timestamp.now(tz=TZ).normalize()
     rng = np.random.default_rng(11)
-    for b, m, atc, ind in brands:
-        launch = today - pd.DateOffset(months=int(rng.integers(12, 36)))
+    for k in range(n):
+        # beyond the base brands: numbered line extensions ("Avalimab 2", ...)
+        b, m, atc, ind = brands[k % len(brands)]
+        if k >= len(brands):
+            b = f"{b} {k // len(brands) + 1}"
+        launch = today - pd.DateOffset(months=int(rng.integers(*launch_months)))
         rows.append([b, m, atc, ind, launch.date()])
-    df = pd.DataFrame(
+    return pd.DataFrame(
         rows, columns=["brand", "molecule", "atc_code", "indication", "launch_date"]
     )
+
+
+def seed_products(conn, n: int = 8, launch_months: tuple[int, int] = (12, 36)):
+    df = product_frame(n, launch_months)
     with conn.cursor() as cur:
         cur.execute("TRUNCATE TABLE rps_core.dim_product RESTART IDENTITY CASCADE;")
-        path = "/tmp/dim_product.csv"
-        df.to_csv(path, index=False, header=False, date_format="%Y-%m-%d")
-        with open(path, "r") as fh:
-            cur.copy_expert(
-                "COPY rps_core.dim_product (brand, molecule, atc_code, indication, launch_date) "
-                "FROM STDIN WITH (FORMAT CSV)",
-                fh,
-            )
+    copy_frame(conn, df, "rps_core.dim_product", quiet=True)
     print("Seeded dim_product:", len(df))
+    return len(df)
+
+
+FACT_TABLES = [
+    "rps_core.fct_sales",
+    "rps_core.fct_rebates",
+    "rps_core.fct_promo",
+    "rps_core.fct_forecast",
+    "rps_core.fct_inventory",
+]
+RAW_TABLES = [
+    "rps_raw.sales_raw",
+    "rps_raw.rebates_raw",
+    "rps_raw.promo_raw",
+    "rps_raw.forecast_raw",
+]
+RAW_STEMS = [t.split(".", 1)[1] for t in RAW_TABLES]  # as listed in sources.toml `tables`
+# dims in load order, with their key in build_dims() / read_dims()
+DIM_TABLES = {
+    "rps_core.dim_date": "dates",
+    "rps_core.dim_region": "reg",
+    "rps_core.dim_payer": "pay",
+    "rps_core.dim_product": "prod",
+    "rps_core.dim_channel": "ch",
+}
+
+
+def truncate_tables(conn, tables: list[str]):
+    with conn.cursor() as cur:
+        # facts/raw don't have dependents – restart identity only
+        cur.execute(f"TRUNCATE TABLE {', '.join(tables)} RESTART IDENTITY;")
+
+
+def raw_pipelines(source: dict | None = None) -> dict[str, MessPipeline]:
+    """Mess spec per rps_raw.* table for one source system (rates from MESS_RATE_*)."""
+    source = source or {"name": SRC_SYSTEM}
+    rates = dict(
+        rate_types=source.get("mess_types", MESS_RATE_TYPES),
+        rate_dates=source.get("mess_dates", MESS_RATE_DATES),
+        rate_fk=source.get("mess_fk", MESS_RATE_FK_BREAKS),
+        rate_dupes=source.get("mess_dupes", MESS_RATE_DUPES),
+        source_system=source["name"],
+        batch_days=source.get("batch_days", 0),
+    )
+    return {
+        "rps_raw.sales_raw": MessPipeline(
+            numeric=("units", "list_price_chf", "gross_sales_chf"),
+            fks=("product_id", "region_id", "channel_id"),
+            dupe_keys=("date_id", "product_id", "region_id", "channel_id"),
+            source_file="sales_raw.csv",
+            **rates,
+        ),
+        "rps_raw.rebates_raw": MessPipeline(
+            numeric=("rebate_chf",),
+            fks=("product_id", "payer_id", "region_id"),
+            dupe_keys=("date_id", "product_id", "region_id", "payer_id"),
+            source_file="rebates_raw.csv",
+            **rates,
+        ),
+        "rps_raw.promo_raw": MessPipeline(
+            numeric=("spend_chf", "touchpoints"),
+            fks=("product_id", "region_id", "channel_id"),
+            dupe_keys=("date_id", "product_id", "region_id", "channel_id"),
+            source_file="promo_raw.csv",
+            **rates,
+        ),
+        "rps_raw.forecast_raw": MessPipeline(
+            numeric=("baseline_units", "uplift_units", "forecast_units"),
+            fks=("product_id", "region_id"),
+            dupe_keys=("date_id", "product_id", "region_id"),
+            source_file="forecast_raw.csv",
+            **rates,
+        ),
+    }
+
+
+def source_split(
+    df: pd.DataFrame, table: str, sources: list[dict], rng: np.random.Generator
+) -> Iterator[tuple[dict, pd.DataFrame]]:
+    """Fan one fact frame out to the source systems that report `table`.
+
+    Every row gets one owner, drawn by weight; other systems also report it with their
+    `overlap` chance, with `drift` noise on the first numeric column so the copies
+    conflict with the owner's.
+    """
+    stem = table.split(".", 1)[1]
+    feeds = [src for src in sources if stem in src.get("tables", [stem])]
+    if len(feeds) == 1:
+        yield feeds[0], df
+        return
+    weights = np.array([src["weight"] for src in feeds], dtype=np.float64)
+    owner = rng.choice(len(feeds), size=len(df), p=weights / weights.sum())
+    for j, src in enumerate(feeds):
+        own = owner == j
+        take = own | (rng.random(len(df)) < src.get("overlap", 0.0))
+        part = df[take].reset_index(drop=True)
+        drift = src.get("drift", 0.0)
+        col = raw_pipelines(src)[table].numeric[0]
+        if drift and (~own[take]).any():
+            copied = ~own[take]
+            noisy = part[col].to_numpy(dtype=np.float64)
+            noisy[copied] *= 1 + rng.normal(0, drift, size=int(copied.sum()))
+            digits = 0 if pd.api.types.is_integer_dtype(part[col]) else 2
+            part[col] = noisy.round(digits).astype(part[col].dtype)
+        yield src, part
+
+
+def raw_frames(
+    s_df: pd.DataFrame,
+    r_df: pd.DataFrame,
+    p_df: pd.DataFrame,
+    f_df: pd.DataFrame,
+    rng: np.random.Generator,
+    timer=None,
+    sources: list[dict] | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Messy TEXT copies of the fact frames, keyed by their rps_raw.* table.
+
+    With several `sources`, each table is the union of every system's feed, each with
+    its own mess rates, file batches and source_system lineage.
+    """
+    timer = timer or _untimed
+    sources = sources or [{"name": SRC_SYSTEM}]
+    out = {}
+    for table, df in zip(RAW_TABLES, [s_df, r_df, p_df, f_df], strict=True):
+        with timer(table):
+            parts = [
+                raw_pipelines(src)[table].apply(part, rng)
+                for src, part in source_split(df, table, sources, rng)
+            ]
+            out[table] = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+    return out
+
+
+def _untimed(stage: str):
+    return nullcontext()
+
+
+def ordered_map(fn, items: Iterable[tuple], workers: int) -> Iterator:
+    """Like map(fn, *item) but over a process pool (workers=0 → all cores).
+
+    Results come back in input order, with at most 2×workers chunks in flight so a
+    slow consumer (COPY) caps memory instead of queueing every finished chunk.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from (fn(*item) for item in items)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(fn, *item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def product_frames(
+    ctx: dict, products: pd.DataFrame, seed: np.random.SeedSequence, timer=None
+) -> dict[str, pd.DataFrame]:
+    """Fact (and messy raw) frames for a slice of products, drawn only from `seed`.
+
+    Runs in worker processes, so everything it needs comes in through `ctx`.
+    `timer(stage)` (a context manager, stage = target table) wraps each step.
+    """
+    timer = timer or _untimed
+    fact_seed, raw_seed = seed.spawn(2)
+    rng = np.random.default_rng(fact_seed)
+    # SALES (columnar product × region × channel × day grid)
+    with timer("rps_core.fct_sales"):
+        region_ids = ctx["reg"]["region_id"].to_numpy()
+        prices = series_prices(
+            products["product_id"], len(region_ids), len(ctx["ch_ids"]), ctx["seed"]
+        )
+        s_df = sales_frame(
+            ctx["days"],
+            products,
+            region_ids,
+            ctx["ch_ids"],
+            ctx["base_mu"],
+            rng,
+            prices=prices,
+            origin=ctx["origin"],
+            horizon=ctx["horizon"],
+        )
+    # REBATES (payer mix, one batched draw)
+    with timer("rps_core.fct_rebates"):
+        r_df = rebates_frame(s_df, ctx["reg"], ctx["pay"], rng, shares=ctx["shares"])
+    # PROMO (campaign bursts, channels drawn per row)
+    with timer("rps_core.fct_promo"):
+        p_df = promo_frame(
+            s_df,
+            ctx["ch"]["channel_id"].to_numpy(),
+            rng,
+            campaign_rate=PROMO_CAMPAIGN_RATE,
+            campaign_days=PROMO_CAMPAIGN_DAYS,
+        )
+    # FORECAST (baseline + uplift), continuing from the previous load's tail if any
+    with timer("rps_core.fct_forecast"):
+        history = ctx.get("history")
+        if history is not None:
+            history = history[history["product_id"].isin(products["product_id"])]
+        f_df = forecast_frame(s_df, r_df, p_df, history=history)
+    # INVENTORY (reorder-point simulation over sales demand), from the last stock and
+    # demand window if any
+    with timer("rps_core.fct_inventory"):
+        stock = ctx.get("stock")
+        if stock is not None:
+            stock = stock[stock["product_id"].isin(products["product_id"])]
+        demand = ctx.get("demand")
+        if demand is not None:
+            demand = demand[demand["product_id"].isin(products["product_id"])]
+        i_df = inventory_frame(s_df, rng, start=stock, history=demand, seed=ctx["seed"])
+
+    frames = dict(zip(FACT_TABLES, [s_df, r_df, p_df, f_df, i_df], strict=True))
+    # Append mode: keep only days after each fact's last loaded date
+    for table, last in ctx.get("last", {}).items():
+        if last is not None:
+            frames[table] = frames[table][frames[table]["date_id"] > last]
+    if WRITE_RAW:
+        rng = np.random.default_rng(raw_seed)
+        facts = [frames[t] for t in FACT_TABLES[: len(RAW_TABLES)]]
+        frames.update(raw_frames(*facts, rng, timer=timer, sources=ctx["sources"]))
+    return frames
 
 
-def synthesize(conn):
-    # scale knobs
-    if SCALE == "medium":
-        weeks_per_brand = 104
-        regions_per = 26
-        channels = ["Retail", "Hospital", "Specialty"]
-        base_mu = 350
-    else:
-        weeks_per_brand = 78
-        regions_per = 12
-        channels = ["Retail", "Hospital"]
-        base_mu = 180
+def timed_product_frames(
+    ctx: dict, products: pd.DataFrame, seed: np.random.SeedSequence, trace_memory: bool = False
+) -> tuple[dict[str, pd.DataFrame], dict[str, dict]]:
+    """product_frames plus its per-stage records (plain dicts, so workers can return them)."""
+    rec = Recorder(trace_memory)
+    frames = product_frames(ctx, products, seed, timer=rec.stage)
+    for table, df in frames.items():
+        rec.add(table, rows=len(df))
+    return frames, rec.stages
 
-    engine = connect_engine()
 
-    # --- FIX: ensure Timestamp dtype for comparisons ---
-    dates = pd.read_sql(
-        "SELECT date_id FROM rps_core.dim_date ORDER BY date_id", engine
-    )
-    dates["date_id"] = pd.to_datetime(dates["date_id"])  # <- add this
-    last_date = dates["date_id"].max()
-    start_date = last_date - pd.Timedelta(weeks=weeks_per_brand)
-    window = dates[dates["date_id"] >= start_date]
-
-    prod = pd.read_sql("SELECT * FROM rps_core.dim_product ORDER BY product_id", engine)
-    reg = pd.read_sql(
-        "SELECT * FROM rps_core.dim_region ORDER BY region_id", engine
-    ).sample(n=min(regions_per, 26), random_state=7)
-    ch = pd.read_sql("SELECT * FROM rps_core.dim_channel ORDER BY channel_id", engine)
-    pay = pd.read_sql("SELECT * FROM rps_core.dim_payer ORDER BY payer_id", engine)
-
-    # SALES
-    sales_rows = []
-    rng = np.random.default_rng(42)
-    for _, pr in prod.iterrows():
-        launch = pd.to_datetime(pr["launch_date"]) + pd.Timedelta(weeks=4)
-        w = window[window["date_id"] >= launch]
-        for _, rg in reg.iterrows():
-            for cname in channels:
-                ch_id = int(ch[ch["channel_name"] == cname]["channel_id"].iloc[0])
-                t = len(w)
-                if t == 0:
-                    continue
-                season = np.sin(np.linspace(0, 4 * np.pi, t)) * 0.1
-                base = rng.lognormal(mean=np.log(base_mu), sigma=0.4, size=t)
-                ramp = np.clip(np.linspace(0.5, 1.2, t), 0.5, 1.2)
-                noise = rng.normal(1.0, 0.08, size=t)
-                units = np.maximum(0, (base * ramp * (1 + season) * noise)).astype(int)
-                price = float(rng.uniform(120.0, 350.0))
-                gross = (units * price).round(2)
-                for dt, u, g in zip(w["date_id"].values, units, gross):
-                    sales_rows.append(
-                        [
-                            pd.to_datetime(dt).date(),
-                            int(pr["product_id"]),
-                            int(rg["region_id"]),
-                            ch_id,
-                            int(u),
-                            price,
-                            float(g),
-                        ]
-                    )
-    s_df = pd.DataFrame(
-        sales_rows,
-        columns=[
-            "date_id",
-            "product_id",
-            "region_id",
-            "channel_id",
-            "units",
-            "list_price_chf",
-            "gross_sales_chf",
-        ],
-    )
+def recorded(results: Iterable[tuple[dict, dict]], recorder: Recorder) -> Iterator[dict]:
+    """Fold each chunk's stage records into `recorder`, passing the frames through."""
+    for frames, stages in results:
+        recorder.merge(stages)
+        yield frames
 
-    # REBATES (payer mix)
-    rebate_rows = []
-    for _, row in s_df.iterrows():
-        payer = pay.sample(1).iloc[0]
-        pct = float(np.random.uniform(0.05, 0.22))
-        rebate = float(row["gross_sales_chf"] * pct)
-        rebate_rows.append(
-            [
-                row["date_id"],
-                row["product_id"],
-                int(payer["payer_id"]),
-                row["region_id"],
-                rebate,
-            ]
+
+def save_window(conn, ctx: dict):
+    """Record the full load's trend window (sales_frame's origin and horizon)."""
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE TABLE rps_core.sales_window;")
+        cur.execute(
+            "INSERT INTO rps_core.sales_window (origin, horizon_days) VALUES (%s, %s);",
+            (ctx["origin"].date(), ctx["horizon"]),
         )
-    r_df = pd.DataFrame(
-        rebate_rows,
-        columns=["date_id", "product_id", "payer_id", "region_id", "rebate_chf"],
+
+
+def read_window(engine) -> dict:
+    """Trend window recorded by the last full load; {} if there is none."""
+    df = pd.read_sql("SELECT origin, horizon_days FROM rps_core.sales_window", engine)
+    if df.empty:
+        return {}
+    return {
+        "origin": pd.Timestamp(df["origin"].iloc[0]),
+        "horizon": int(df["horizon_days"].iloc[0]),
+    }
+
+
+def sales_tail(engine, last: pd.Timestamp) -> pd.DataFrame:
+    """Units per product × region for the 4 days up to `last` (forecast_frame's history)."""
+    return pd.read_sql(
+        """
+        SELECT date_id, product_id, region_id, SUM(units) AS units_total
+        FROM rps_core.fct_sales
+        WHERE date_id > %(last)s::date - 4 AND date_id <= %(last)s::date
+        GROUP BY 1, 2, 3
+        """,
+        engine,
+        params={"last": last.date()},
     )
 
-    # PROMO
-    promo_rows = []
-    for pid, grp in s_df.groupby("product_id"):
-        by_wr = grp.groupby(["date_id", "region_id"], as_index=False)["units"].sum()
-        by_wr["spend_chf"] = (by_wr["units"] * np.random.uniform(0.5, 1.5)).round(2)
-        by_wr["touchpoints"] = (by_wr["units"] * np.random.uniform(0.01, 0.03)).astype(
-            int
+
+def append_state(engine) -> dict:
+    """Last loaded date per fact, the trend window, the sales tail the forecast baseline
+    needs, closing stock and the demand window behind the reorder points."""
+    last = {}
+    for table in FACT_TABLES:
+        d = pd.read_sql(f"SELECT max(date_id) AS d FROM {table}", engine)["d"].iloc[0]
+        last[table] = pd.Timestamp(d) if d is not None else None
+    if last["rps_core.fct_sales"] is None:
+        raise RuntimeError("fct_sales is empty; run a full load before --append")
+    history = sales_tail(engine, last["rps_core.fct_sales"])
+    # Closing stock per series, so the inventory simulation continues from it
+    stock = pd.read_sql(
+        """
+        SELECT DISTINCT ON (product_id, region_id)
+               product_id, region_id, on_hand_units, on_order_units
+        FROM rps_core.fct_inventory
+        ORDER BY product_id, region_id, date_id DESC
+        """,
+        engine,
+    )
+    # ...and the demand the reorder points' trailing mean still covers
+    demand = None
+    if last["rps_core.fct_inventory"] is not None:
+        demand = pd.read_sql(
+            """
+            SELECT date_id, product_id, region_id, demand_units
+            FROM rps_core.fct_inventory
+            WHERE date_id > %(last)s::date - %(window)s AND date_id <= %(last)s::date
+            """,
+            engine,
+            params={"last": last["rps_core.fct_inventory"].date(), "window": INVENTORY_WINDOW},
         )
-        for _, r in by_wr.iterrows():
-            ch_id = int(ch.sample(1).iloc[0]["channel_id"])
-            promo_rows.append(
-                [
-                    r["date_id"],
-                    int(pid),
-                    int(r["region_id"]),
-                    ch_id,
-                    float(r["spend_chf"]),
-                    int(max(1, r["touchpoints"])),
-                ]  # noqa: E501
+    window = read_window(engine)
+    if not window:
+        raise RuntimeError("rps_core.sales_window is empty; run a full load before --append")
+    return {"last": last, **window, "history": history, "stock": stock, "demand": demand}
+
+
+def seed_channels(conn, names: list[str]):
+    """Add any channel the scale profile needs that dim_channel doesn't have yet."""
+    with conn.cursor() as cur:
+        for name in names:
+            cur.execute(
+                """
+                INSERT INTO rps_core.dim_channel (channel_name)
+                SELECT %s
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM rps_core.dim_channel WHERE channel_name = %s
+                )
+                """,
+                (name, name),
             )
-    p_df = pd.DataFrame(
-        promo_rows,
-        columns=[
-            "date_id",
-            "product_id",
-            "region_id",
-            "channel_id",
-            "spend_chf",
-            "touchpoints",
-        ],
+    print("Seeded dim_channel:", len(names))
+    return len(names)
+
+
+def with_ids(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    """Number rows 1..n the way a SERIAL column would on a fresh table."""
+    return df.assign(**{key: np.arange(1, len(df) + 1)})[[key, *df.columns]]
+
+
+def build_dims(profile: dict, today: pd.Timestamp | None = None) -> dict[str, pd.DataFrame]:
+    """Dimension frames as a fresh seed for `profile` leaves them (no database)."""
+    channels = ["Retail", "Hospital", "Specialty"]
+    channels += [c for c in profile["channels"] if c not in channels]
+    dates = date_spine(profile["years"], today)
+    dates["date_id"] = pd.to_datetime(dates["date_id"])
+    prod = product_frame(profile["products"], tuple(profile["launch_months"]))
+    return {
+        "dates": dates,
+        "prod": with_ids(prod, "product_id"),
+        "reg": with_ids(region_frame(), "region_id"),
+        "ch": with_ids(pd.DataFrame({"channel_name": channels}), "channel_id"),
+        "pay": with_ids(payer_frame(profile["payers"]), "payer_id"),
+    }
+
+
+def read_dims(engine) -> dict[str, pd.DataFrame]:
+    """Dimension frames as currently loaded in rps_core."""
+    dates = pd.read_sql("SELECT date_id FROM rps_core.dim_date ORDER BY date_id", engine)
+    dates["date_id"] = pd.to_datetime(dates["date_id"])
+    return {
+        "dates": dates,
+        "prod": pd.read_sql("SELECT * FROM rps_core.dim_product ORDER BY product_id", engine),
+        "reg": pd.read_sql("SELECT * FROM rps_core.dim_region ORDER BY region_id", engine),
+        "ch": pd.read_sql("SELECT * FROM rps_core.dim_channel ORDER BY channel_id", engine),
+        "pay": pd.read_sql("SELECT * FROM rps_core.dim_payer ORDER BY payer_id", engine),
+    }
+
+
+def profile_sources(profile: dict) -> list[dict]:
+    """SOURCES env (comma-separated) wins over the profile's `sources`.
+
+    Without either, raw tables come from one SRC_SYSTEM feed with the global rates.
+    """
+    names = [name.strip() for name in SOURCES.split(",") if name.strip()]
+    names = names or profile.get("sources")
+    return load_sources(names) if names else [{"name": SRC_SYSTEM}]
+
+
+def frame_jobs(
+    dims: dict, profile: dict, seed: int = SEED, state: dict | None = None
+) -> tuple[dict, list[tuple[pd.DataFrame, np.random.SeedSequence]]]:
+    """Shared context plus one (products, seed) job per product for product_frames."""
+    weeks_per_brand = profile["sales_weeks"]
+    dates = dims["dates"]
+    last_date = dates["date_id"].max()
+    window = dates[dates["date_id"] >= last_date - pd.Timedelta(weeks=weeks_per_brand)]
+    if state:
+        # Only the days after the oldest per-fact watermark; series pick up from there
+        done = min(d for d in state["last"].values() if d is not None)
+        window = dates[dates["date_id"] > done]
+
+    reg = dims["reg"].sample(n=min(profile["regions"], 26), random_state=7)
+    ch = dims["ch"]
+    prod = dims["prod"]
+    ctx = {
+        "days": window["date_id"],
+        "reg": reg,
+        "pay": dims["pay"],
+        "ch": ch,
+        "ch_ids": ch.set_index("channel_name").loc[profile["channels"], "channel_id"].to_numpy(),
+        "base_mu": profile["base_mu"],
+        "shares": load_payer_shares(PAYER_SHARES),
+        "sources": profile_sources(profile),
+        "origin": window["date_id"].iloc[0] if len(window) else None,
+        "horizon": weeks_per_brand * 7 + 1,
+        "seed": seed,
+        **(state or {}),
+    }
+    if window.empty:
+        return ctx, []
+    # One child seed per product: output is identical whatever the worker count.
+    # Append runs mix in the first new day so each refresh draws fresh noise.
+    entropy = [seed, window["date_id"].iloc[0].toordinal()] if state else seed
+    seeds = np.random.SeedSequence(entropy).spawn(len(prod))
+    return ctx, [(prod.iloc[[i]], s) for i, s in enumerate(seeds)]
+
+
+def concat_frames(parts: Iterable[dict[str, pd.DataFrame]]) -> dict[str, pd.DataFrame]:
+    """Stack per-product frame dicts into one frame per table."""
+    parts = list(parts)
+    if not parts:
+        return {}
+    return {t: pd.concat([p[t] for p in parts], ignore_index=True) for t in parts[0]}
+
+
+def synthesize_frames(
+    dims: dict,
+    profile: dict,
+    seed: int = SEED,
+    workers: int = 1,
+    state: dict | None = None,
+) -> dict[str, pd.DataFrame]:
+    """All fact (and raw) frames for `profile`, keyed by table — pure, no database I/O."""
+    ctx, jobs = frame_jobs(dims, profile, seed, state)
+    return concat_frames(ordered_map(partial(product_frames, ctx), jobs, workers))
+
+
+def load_results(loader, results: Iterator[dict], stream: bool, recorder: Recorder):
+    """Hand per-product frames to `loader` (ParallelLoader, BulkLoad or FileSink)."""
+    if stream:
+        # Streaming: each product's chunk is loaded as soon as it is ready, so peak
+        # memory is bounded by a few products' grids.
+        for frames in results:
+            with recorder.stage("copy"):
+                recorder.add_copies(loader.load(frames))
+    else:
+        parts = list(results)
+        with recorder.stage("concat"):
+            frames = concat_frames(parts)
+        with recorder.stage("copy"):
+            recorder.add_copies(loader.load(frames))
+
+
+def export_files(
+    profile: dict,
+    root: str,
+    workers: int = 1,
+    stream: bool = False,
+    recorder: Recorder | None = None,
+):
+    """Write dims, facts and raw tables as Parquet / Arrow datasets under `root` (no DB)."""
+    recorder = recorder or Recorder()
+    with recorder.stage("build_dims"):
+        dims = build_dims(profile)
+    ctx, jobs = frame_jobs(dims, profile, SEED)
+    timed = partial(timed_product_frames, ctx, trace_memory=recorder.trace_memory)
+    results = recorded(ordered_map(timed, jobs, workers), recorder)
+    tables = list(DIM_TABLES) + FACT_TABLES + (RAW_TABLES if WRITE_RAW else [])
+    window = {"origin": str(ctx["origin"].date()), "horizon": ctx["horizon"]}
+    sink = FileSink(root, tables, meta={"scale": SCALE, "seed": SEED, "sales_window": window})
+    with sink:
+        with recorder.stage("copy"):
+            recorder.add_copies(sink.load({t: dims[key] for t, key in DIM_TABLES.items()}))
+        load_results(sink, results, stream, recorder)
+        with recorder.stage("verify"):
+            sink.verify()
+    print(f"SCALE={SCALE}: wrote {sum(sink.sent.values())} rows under {root}")
+
+
+def synthesize(
+    conn,
+    profile: dict,
+    workers: int = 1,
+    load_connections: int = 1,
+    stream: bool = False,
+    bulk: bool = False,
+    append: bool = False,
+    recorder: Recorder | None = None,
+):
+    recorder = recorder or Recorder()
+    engine = connect_engine()
+    dims = read_dims(engine)
+    state = append_state(engine) if append else None
+    ctx, jobs = frame_jobs(dims, profile, SEED, state)
+    window = ctx["days"]
+    if append:
+        done = min(d for d in state["last"].values() if d is not None)
+        if not jobs:
+            print(f"Append: nothing to do, facts already loaded through {done.date()}")
+            return
+        print(f"Append: {len(window)} new day(s) after {done.date()}")
+
+    timed = partial(timed_product_frames, ctx, trace_memory=recorder.trace_memory)
+    results = recorded(ordered_map(timed, jobs, workers), recorder)
+    tables = FACT_TABLES + (RAW_TABLES if WRITE_RAW else [])
+    verify_filters = None
+    if append:
+        # Add to what's there; the checkpoint only counts rows from this run
+        with conn.cursor() as cur:
+            cur.execute("SELECT now();")
+            run_start = cur.fetchone()[0]
+        verify_filters = {
+            t: ("date_id > %s", (d.date(),)) for t, d in state["last"].items() if d is not None
+        }
+        verify_filters.update({t: ("raw_ingest_ts >= %s", (run_start,)) for t in RAW_TABLES})
+        loader = ParallelLoader(connect, connections=load_connections)
+    elif bulk:
+        # One transaction: TRUNCATE → COPY FREEZE → rebuild indexes/FKs → ANALYZE
+        unlogged = RAW_TABLES if WRITE_RAW and BULK_UNLOGGED_RAW else []
+        loader = BulkLoad(conn, tables, unlogged=unlogged)
+    else:
+        truncate_tables(conn, tables)
+        loader = ParallelLoader(connect, connections=load_connections)
+    with loader:
+        load_results(loader, results, stream, recorder)
+    with recorder.stage("verify"):
+        loader.verify(conn, filters=verify_filters)
+    if not append:
+        save_window(conn, ctx)
+
+    sales_rows = loader.sent.get("rps_core.fct_sales", 0)
+    print(
+        f"SCALE={SCALE}: {sales_rows} fct_sales rows over {len(window)} days — "
+        f"{sales_rows / max(len(window), 1):,.0f} rows/day at average, "
+        f"target {profile.get('target_rows_per_day', 'n/a')} at full ramp"
     )
 
-    # FORECAST (baseline + uplift)
-    s_agg = s_df.groupby(["date_id", "product_id", "region_id"], as_index=False).agg(
-        units_total=("units", "sum"), gross_sales_chf=("gross_sales_chf", "sum")
-    )
-    r_agg = r_df.groupby(["date_id", "product_id", "region_id"], as_index=False).agg(
-        rebate_chf=("rebate_chf", "sum")
-    )
-    merged = (
-        pd.merge(s_agg, r_agg, how="left", on=["date_id", "product_id", "region_id"])
-        .fillna({"rebate_chf": 0.0})
-        .copy()
+
+def main(argv: list[str] | None = None):
+    profile = load_scale(SCALE)
+    parser = argparse.ArgumentParser(description="Seed rps_core/rps_raw with synthetic data.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WORKERS", profile.get("workers", 1))),
+        help="processes for per-product generation (0 = all cores)",
     )
-    merged["rebate_rate"] = np.where(
-        merged["gross_sales_chf"] > 0,
-        merged["rebate_chf"] / merged["gross_sales_chf"],
-        0.0,
+    parser.add_argument(
+        "--load-connections",
+        type=int,
+        default=int(os.getenv("LOAD_CONNECTIONS", profile.get("load_connections", 1))),
+        help="Postgres connections used to COPY facts/raw tables concurrently",
     )
-    p_agg = p_df.groupby(["date_id", "product_id", "region_id"], as_index=False).agg(
-        spend_chf=("spend_chf", "sum"), touchpoints=("touchpoints", "sum")
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        default=os.getenv("APPEND", "0") == "1",
+        help="keep existing data; extend dim_date and facts with the days since the last load",
     )
-    m = (
-        pd.merge(merged, p_agg, how="left", on=["date_id", "product_id", "region_id"])
-        .fillna({"spend_chf": 0.0, "touchpoints": 0})
-        .sort_values(["product_id", "region_id", "date_id"])
+    parser.add_argument(
+        "--output",
+        default=os.getenv("OUTPUT_DIR", ""),
+        help="write Parquet/Arrow datasets under this directory instead of loading Postgres",
     )
-    m["baseline_units"] = (
-        m.groupby(["product_id", "region_id"])["units_total"]
-        .transform(lambda s: s.shift(1).rolling(4, min_periods=1).mean())
-        .fillna(0)
+    args = parser.parse_args(argv)
+    if args.append and (BULK_LOAD or args.output):
+        parser.error("--append extends the database in place; drop BULK_LOAD / --output")
+    stream = os.getenv("STREAM", "1" if profile.get("stream") else "0") == "1"
+    recorder = Recorder(trace_memory=RUN_TRACE_MEMORY)
+    report_meta = dict(
+        scale=SCALE, workers=args.workers, load_connections=args.load_connections, seed=SEED
     )
-    alpha, beta = 0.003, -0.5
-    m["uplift_units"] = (
-        alpha * m["spend_chf"] + beta * m["rebate_rate"] * m["units_total"]
-    ).clip(lower=-0.4 * m["units_total"], upper=0.5 * m["units_total"])
-    m["forecast_units"] = np.maximum(0, m["baseline_units"] + m["uplift_units"])
-    f_df = m[
-        [
-            "date_id",
-            "product_id",
-            "region_id",
-            "baseline_units",
-            "uplift_units",
-            "forecast_units",
-        ]
-    ].copy()
 
-    # ---- loaders -----------------------------------------------------------
+    if args.output:
+        export_files(profile, args.output, workers=args.workers, stream=stream, recorder=recorder)
+        report = recorder.report(mode="files", **report_meta)
+        print_report(report)
+        if RUN_REPORT:
+            write_report(report, RUN_REPORT)
+        return
 
-    def copy_df(conn, df, table):
-        cols = ", ".join(df.columns)
-        path = f"/tmp/{table.replace('.', '_')}.csv"
-        df.to_csv(path, index=False, header=False, date_format="%Y-%m-%d")
-        with conn.cursor() as cur:
-            # facts don't have dependents – restart identity only
-            cur.execute(f"TRUNCATE TABLE {table} RESTART IDENTITY;")
-            with open(path, "r") as fh:
-                cur.copy_expert(
-                    f"COPY {table} ({cols}) FROM STDIN WITH (FORMAT CSV)", fh
-                )
-        print(f"Loaded {table}: {len(df)}")
-
-    # ---- loaders -----------------------------------------------------------
-
-    # existing clean loads (unchanged)
-    copy_df(conn, s_df, "rps_core.fct_sales")
-    copy_df(conn, r_df, "rps_core.fct_rebates")
-    copy_df(conn, p_df, "rps_core.fct_promo")
-    copy_df(conn, f_df, "rps_core.fct_forecast")
-
-    # --- NEW: write messy raw copies to rps_raw.* ---
-    if WRITE_RAW:
-        # SALES raw
-        sr = s_df.copy()
-        # Date to iso string first
-        sr["date_id"] = pd.to_datetime(sr["date_id"]).dt.date.astype(str)
-        # Make some numeric columns messy
-        sr = messy_numeric(
-            sr, ["units", "list_price_chf", "gross_sales_chf"], MESS_RATE_TYPES, RAW_RNG
-        )
-        # FK breaks
-        sr = inject_fk_breaks(
-            sr, ["product_id", "region_id", "channel_id"], MESS_RATE_FK_BREAKS, RAW_RNG
-        )
-        # Date format chaos
-        sr = messy_dates(sr, "date_id", MESS_RATE_DATES, RAW_RNG)
-        # Duplicate business keys
-        sr = inject_dupes(
-            sr,
-            ["date_id", "product_id", "region_id", "channel_id"],
-            MESS_RATE_DUPES,
-            RAW_RNG,
-        )
-        # TEXT + lineage
-        sr = as_text(sr)
-        sr = add_lineage(sr, source_system=SRC_SYSTEM, source_file="sales_raw.csv")
-        copy_df_raw(conn, sr, "rps_raw.sales_raw")
-
-        # REBATES raw
-        rr = r_df.copy()
-        rr["date_id"] = pd.to_datetime(rr["date_id"]).dt.date.astype(str)
-        rr = messy_numeric(rr, ["rebate_chf"], MESS_RATE_TYPES, RAW_RNG)
-        rr = inject_fk_breaks(
-            rr, ["product_id", "payer_id", "region_id"], MESS_RATE_FK_BREAKS, RAW_RNG
-        )
-        rr = messy_dates(rr, "date_id", MESS_RATE_DATES, RAW_RNG)
-        rr = inject_dupes(
-            rr, ["date_id", "product_id", "region_id"], MESS_RATE_DUPES, RAW_RNG
-        )
-        rr = as_text(rr)
-        rr = add_lineage(rr, source_system=SRC_SYSTEM, source_file="rebates_raw.csv")
-        copy_df_raw(conn, rr, "rps_raw.rebates_raw")
-
-        # PROMO raw
-        prw = p_df.copy()
-        prw["date_id"] = pd.to_datetime(prw["date_id"]).dt.date.astype(str)
-        prw = messy_numeric(prw, ["spend_chf", "touchpoints"], MESS_RATE_TYPES, RAW_RNG)
-        prw = inject_fk_breaks(
-            prw, ["product_id", "region_id", "channel_id"], MESS_RATE_FK_BREAKS, RAW_RNG
-        )
-        prw = messy_dates(prw, "date_id", MESS_RATE_DATES, RAW_RNG)
-        prw = inject_dupes(
-            prw,
-            ["date_id", "product_id", "region_id", "channel_id"],
-            MESS_RATE_DUPES,
-            RAW_RNG,
-        )
-        prw = as_text(prw)
-        prw = add_lineage(prw, source_system=SRC_SYSTEM, source_file="promo_raw.csv")
-        copy_df_raw(conn, prw, "rps_raw.promo_raw")
-
-        # FORECAST raw
-        fr = f_df.copy()
-        fr["date_id"] = pd.to_datetime(fr["date_id"]).dt.date.astype(str)
-        fr = messy_numeric(
-            fr,
-            ["baseline_units", "uplift_units", "forecast_units"],
-            MESS_RATE_TYPES,
-            RAW_RNG,
-        )
-        fr = inject_fk_breaks(
-            fr, ["product_id", "region_id"], MESS_RATE_FK_BREAKS, RAW_RNG
-        )
-        fr = messy_dates(fr, "date_id", MESS_RATE_DATES, RAW_RNG)
-        fr = inject_dupes(
-            fr, ["date_id", "product_id", "region_id"], MESS_RATE_DUPES, RAW_RNG
-        )
-        fr = as_text(fr)
-        fr = add_lineage(fr, source_system=SRC_SYSTEM, source_file="forecast_raw.csv")
-        copy_df_raw(conn, fr, "rps_raw.forecast_raw")
-
-
-def main():
     conn = connect()
     with conn.cursor() as cur:
         cur.execute("SELECT current_database(), current_user;")
         print("Connected to:", cur.fetchone())
         cur.execute("SELECT to_regclass('rps_core.dim_date');")
         print("regclass rps_core.dim_date =", cur.fetchone()[0])
-    seed_dates(conn)
-    seed_regions(conn)
-    seed_payers(conn)
-    seed_products(conn)
-    synthesize(conn)
+    if args.append:
+        seeds = [("extend_dates", partial(extend_dates, conn))]
+    else:
+        seeds = [
+            ("seed_dates", partial(seed_dates, conn, years=profile["years"])),
+            ("seed_regions", partial(seed_regions, conn)),
+            ("seed_payers", partial(seed_payers, conn, n=profile["payers"])),
+            (
+                "seed_products",
+                partial(
+                    seed_products,
+                    conn,
+                    n=profile["products"],
+                    launch_months=tuple(profile["launch_months"]),
+                ),
+            ),
+            ("seed_channels", partial(seed_channels, conn, profile["channels"])),
+        ]
+    for name, seed in seeds:
+        with recorder.stage(name) as st:
+            st.rows = seed()
+    synthesize(
+        conn,
+        profile,
+        workers=args.workers,
+        load_connections=args.load_connections,
+        stream=stream,
+        bulk=BULK_LOAD,
+        append=args.append,
+        recorder=recorder,
+    )
     print("Data generation complete.")
 
+    mode = "append" if args.append else "bulk" if BULK_LOAD else "stream" if stream else "batch"
+    report = recorder.report(mode=mode, **report_meta)
+    print_report(report)
+    if RUN_REPORT:
+        write_report(report, RUN_REPORT)
+    if RUN_REPORT_DB:
+        save_report(conn, report)
+
 
 if __name__ == "__main__":
     main()
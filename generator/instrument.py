@@ -0,0 +1,155 @@
+# generator/instrument.py
+# Per-stage wall/CPU time, rows and memory for a generator run; JSON + rps_core.load_runs.
+import json
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+from psycopg2.extras import execute_values
+
+STAGE_FIELDS = ("wall_s", "cpu_s", "rows", "bytes", "peak_mb", "calls")
+
+
+class Stage:
+    """Mutable handle yielded by Recorder.stage(); set `rows` (and `bytes`) inside the block."""
+
+    def __init__(self):
+        self.rows: int | None = None
+        self.bytes: int | None = None
+
+
+class Recorder:
+    """Collect per-stage timings for one run.
+
+    A stage entered several times (e.g. once per product chunk) is summed; peak_mb is
+    the max tracemalloc peak seen in any one call. Memory tracing is opt-in, since it
+    slows the object-heavy messy layers several-fold. Records are plain dicts, so
+    worker processes can return theirs for `merge()`.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages: dict[str, dict] = {}
+        self.started = time.time()
+
+    def add(self, name: str, **fields):
+        rec = self.stages.setdefault(name, dict.fromkeys(STAGE_FIELDS))
+        for key, value in fields.items():
+            if value is None:
+                continue
+            if key == "peak_mb":
+                rec[key] = max(rec[key] or 0.0, value)
+            else:
+                rec[key] = (rec[key] or 0) + value
+
+    def merge(self, stages: dict[str, dict]):
+        for name, rec in stages.items():
+            self.add(name, **rec)
+
+    @contextmanager
+    def stage(self, name: str):
+        st = Stage()
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        w0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            yield st
+        finally:
+            peak = None
+            if self.trace_memory:
+                peak = (tracemalloc.get_traced_memory()[1] - base) / 1e6
+            self.add(
+                name,
+                wall_s=time.perf_counter() - w0,
+                cpu_s=time.thread_time() - c0,
+                rows=st.rows,
+                bytes=st.bytes,
+                peak_mb=peak,
+                calls=1,
+            )
+
+    def add_copies(self, stats: list[dict]):
+        """Fold copy_frame stats (one per COPY slice) into copy:<table> stages."""
+        for st in stats:
+            self.add(
+                f"copy:{st['table']}",
+                wall_s=st["seconds"],
+                cpu_s=st.get("cpu_seconds"),
+                rows=st["rows"],
+                bytes=st["bytes"],
+                calls=1,
+            )
+
+    def report(self, **meta) -> dict:
+        stages = {}
+        for name, rec in self.stages.items():
+            out = {k: round(v, 4) if isinstance(v, float) else v for k, v in rec.items()}
+            wall = rec["wall_s"] or 0.0
+            out["rows_per_s"] = round(rec["rows"] / wall, 1) if rec["rows"] and wall else None
+            stages[name] = out
+        return {
+            "run_id": str(uuid.uuid4()),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.started)),
+            "wall_s": round(time.time() - self.started, 3),
+            **meta,
+            "stages": stages,
+        }
+
+
+def print_report(report: dict):
+    print(f"Run report ({report['wall_s']:.1f}s wall):")
+    for name, st in report["stages"].items():
+        rows = f"{st['rows']:>12,}" if st["rows"] is not None else " " * 12
+        rate = f"{st['rows_per_s']:>12,.0f}/s" if st["rows_per_s"] else " " * 14
+        peak = f"{st['peak_mb']:>8.1f} MB" if st["peak_mb"] is not None else ""
+        cpu = st["cpu_s"] or 0.0
+        print(f"  {name:<28} {st['wall_s']:>8.2f}s {cpu:>8.2f}s cpu {rows} {rate} {peak}")
+
+
+def write_report(report: dict, path: str):
+    """JSON report to `path` ("-" = stdout)."""
+    text = json.dumps(report, indent=2)
+    if path == "-":
+        print(text)
+        return
+    with open(path, "w") as f:
+        f.write(text + "\n")
+    print(f"Wrote run report: {path}")
+
+
+def save_report(conn, report: dict):
+    """One rps_core.load_runs row per stage, all sharing the run's run_id."""
+    rows = [
+        (
+            report["run_id"],
+            report["started_at"],
+            report.get("scale"),
+            report.get("mode"),
+            report.get("workers"),
+            report.get("load_connections"),
+            name,
+            st["wall_s"],
+            st["cpu_s"],
+            st["rows"],
+            st["rows_per_s"],
+            st["bytes"],
+            st["peak_mb"],
+        )
+        for name, st in report["stages"].items()
+    ]
+    with conn.cursor() as cur:
+        execute_values(
+            cur,
+            """
+            INSERT INTO rps_core.load_runs (
+                run_id, started_at, scale, mode, workers, load_connections,
+                stage, wall_s, cpu_s, rows, rows_per_s, bytes, peak_mb
+            ) VALUES %s
+            """,
+            rows,
+        )
+    print(f"Saved run report to rps_core.load_runs: {len(rows)} stage(s)")
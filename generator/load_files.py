@@ -0,0 +1,82 @@
+# generator/load_files.py
+# Load a dataset written by `generate.py --output DIR` into rps_core / rps_raw.
+#
+#   python load_files.py /data/rps --load-connections 8
+import argparse
+import json
+import os
+import time
+from functools import partial
+
+import pandas as pd
+
+from generate import DIM_TABLES, connect, save_window, truncate_tables
+from loader import ParallelLoader, copy_frame, verify_counts
+from sink import MANIFEST, data_files, read_file
+
+
+def reset_serial(conn, table: str, key: str):
+    """Move a SERIAL's sequence past the explicit ids we just COPYed."""
+    with conn.cursor() as cur:
+        cur.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, %s), max({key})) FROM {table};",
+            (table, key),
+        )
+
+
+def load_files(root: str, connections: int = 4) -> dict[str, int]:
+    """Truncate the manifest's tables, load dims in order, then fan out fact/raw files."""
+    with open(os.path.join(root, MANIFEST)) as f:
+        manifest = json.load(f)
+    fmt = manifest["format"]
+    dims = [t for t in DIM_TABLES if t in manifest["tables"]]
+    rest = [t for t in manifest["tables"] if t not in DIM_TABLES]
+
+    conn = connect()
+    t0 = time.perf_counter()
+    with conn.cursor() as cur:
+        # CASCADE also empties the facts that reference the dims
+        cur.execute(f"TRUNCATE TABLE {', '.join(dims)} RESTART IDENTITY CASCADE;")
+    truncate_tables(conn, rest)
+
+    # Dims carry their ids, so they go first, in FK order, on one connection
+    for table in dims:
+        for path in data_files(root, table, fmt):
+            copy_frame(conn, read_file(path, fmt), table)
+        if table != "rps_core.dim_date":
+            reset_serial(conn, table, table.split(".dim_", 1)[1] + "_id")
+
+    # Facts and raw: one job per part file; each worker reads its file, then COPYs it
+    jobs = [
+        (table, partial(read_file, path, fmt))
+        for table in rest
+        for path in data_files(root, table, fmt)
+    ]
+    print(f"Loading {len(jobs)} file(s) over {connections} connection(s)")
+    with ParallelLoader(connect, connections=connections) as loader:
+        loader.load_each(jobs)
+
+    counts = verify_counts(conn, manifest["tables"])
+    if "sales_window" in manifest:
+        window = manifest["sales_window"]
+        save_window(conn, {"origin": pd.Timestamp(window["origin"]), "horizon": window["horizon"]})
+    print(f"Loaded {root} in {time.perf_counter() - t0:.1f}s")
+    conn.close()
+    return counts
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Load generate.py --output files into Postgres.")
+    parser.add_argument("root", help="directory written by generate.py --output")
+    parser.add_argument(
+        "--load-connections",
+        type=int,
+        default=int(os.getenv("LOAD_CONNECTIONS", "4")),
+        help="Postgres connections used to COPY fact/raw files concurrently",
+    )
+    args = parser.parse_args(argv)
+    load_files(args.root, connections=args.load_connections)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+# generator/loader.py
+# Stream DataFrames into Postgres via COPY ... FROM STDIN, straight from memory.
+import io
+import os
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+COPY_FORMAT = os.getenv("COPY_FORMAT", "auto").lower()  # auto | csv | binary
+COPY_CHUNK_ROWS = int(os.getenv("COPY_CHUNK_ROWS", "200000"))
+LOAD_SPLIT_ROWS = int(os.getenv("LOAD_SPLIT_ROWS", "1000000"))
+
+PG_EPOCH = np.datetime64("2000-01-01", "D")
+BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + np.array([0, 0], dtype=">i4").tobytes()
+BINARY_TRAILER = np.array([-1], dtype=">i2").tobytes()
+
+# information_schema data_type -> fixed-width big-endian wire type
+_FIXED_TYPES = {
+    "smallint": ">i2",
+    "integer": ">i4",
+    "bigint": ">i8",
+    "real": ">f4",
+    "double precision": ">f8",
+    "date": ">i4",
+}
+
+_column_types: dict[str, dict[str, tuple[str, int | None, int | None]]] = {}
+
+
+class ChunkStream:
+    """Read-only file-like object over an iterator of byte chunks (for copy_expert)."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._cur = memoryview(b"")
+        self._pos = 0
+        self.nbytes = 0
+
+    def read(self, size: int = -1) -> bytes:
+        while self._pos >= len(self._cur):
+            nxt = next(self._chunks, None)
+            if nxt is None:
+                return b""
+            self._cur, self._pos = memoryview(nxt), 0
+        end = len(self._cur) if size is None or size < 0 else self._pos + size
+        out = self._cur[self._pos : end].tobytes()
+        self._pos += len(out)
+        self.nbytes += len(out)
+        return out
+
+
+def column_types(conn, table: str) -> dict[str, tuple[str, int | None, int | None]]:
+    """{column: (data_type, numeric_precision, numeric_scale)} for a schema-qualified table."""
+    if table not in _column_types:
+        schema, name = table.split(".", 1)
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT column_name, data_type, numeric_precision, numeric_scale
+                FROM information_schema.columns
+                WHERE table_schema = %s AND table_name = %s
+                """,
+                (schema, name),
+            )
+            _column_types[table] = {r[0]: (r[1], r[2], r[3]) for r in cur.fetchall()}
+    return _column_types[table]
+
+
+def _numeric_layout(precision: int | None, scale: int | None) -> tuple[int, int, int]:
+    scale = int(scale or 0)
+    int_digits = int(precision or 28) - scale
+    return -(-int_digits // 4), -(-scale // 4), scale
+
+
+def _binary_dtype(df: pd.DataFrame, types: dict) -> np.dtype | None:
+    """Packed row dtype for PG binary COPY, or None if a column isn't fixed-width."""
+    fields = [("ncols", ">i2")]
+    for i, col in enumerate(df.columns):
+        data_type, precision, scale = types.get(col, ("text", None, None))
+        if data_type in _FIXED_TYPES:
+            payload = np.dtype(_FIXED_TYPES[data_type])
+        elif data_type == "numeric" and precision is not None:
+            ig, fg, _ = _numeric_layout(precision, scale)
+            payload = np.dtype(
+                [("ndigits", ">i2"), ("weight", ">i2"), ("sign", ">u2"), ("dscale", ">i2")]
+                + [("digits", ">i2", (ig + fg,))]
+            )
+        else:
+            return None
+        fields += [(f"len{i}", ">i4"), (f"val{i}", payload)]
+    return np.dtype(fields)
+
+
+def _encode_numeric(out: np.ndarray, values: np.ndarray, precision: int, scale: int | None):
+    ig, fg, scale = _numeric_layout(precision, scale)
+    v = values.astype(np.float64)
+    scaled = np.rint(np.abs(v) * 10**scale).astype(np.int64)
+    int_part, frac_part = np.divmod(scaled, 10**scale)
+    frac_part = frac_part * 10 ** (4 * fg - scale)
+    for g in range(ig):
+        out["digits"][:, ig - 1 - g] = (int_part // 10 ** (4 * g)) % 10000
+    for g in range(fg):
+        out["digits"][:, ig + fg - 1 - g] = (frac_part // 10 ** (4 * g)) % 10000
+    out["ndigits"] = ig + fg
+    out["weight"] = ig - 1
+    out["sign"] = np.where(v < 0, 0x4000, 0)
+    out["dscale"] = scale
+
+
+def encode_binary(df: pd.DataFrame, types: dict, dtype: np.dtype) -> bytes:
+    """Encode a NULL-free frame as PG binary COPY rows (no header/trailer), vectorized."""
+    rows = np.zeros(len(df), dtype=dtype)
+    rows["ncols"] = len(df.columns)
+    for i, col in enumerate(df.columns):
+        data_type, precision, scale = types[col]
+        rows[f"len{i}"] = dtype[f"val{i}"].itemsize
+        if data_type == "date":
+            days = df[col].to_numpy(dtype="datetime64[D]")
+            rows[f"val{i}"] = (days - PG_EPOCH).astype(np.int32)
+        elif data_type == "numeric":
+            _encode_numeric(rows[f"val{i}"], df[col].to_numpy(), precision, scale)
+        else:
+            rows[f"val{i}"] = df[col].to_numpy()
+    return rows.tobytes()
+
+
+def _csv_chunks(df: pd.DataFrame, chunk_rows: int, date_format: str) -> Iterator[bytes]:
+    for start in range(0, len(df), chunk_rows):
+        buf = io.StringIO()
+        df.iloc[start : start + chunk_rows].to_csv(
+            buf, index=False, header=False, date_format=date_format
+        )
+        yield buf.getvalue().encode("utf-8")
+
+
+def _binary_chunks(
+    df: pd.DataFrame, types: dict, dtype: np.dtype, chunk_rows: int
+) -> Iterator[bytes]:
+    yield BINARY_HEADER
+    for start in range(0, len(df), chunk_rows):
+        yield encode_binary(df.iloc[start : start + chunk_rows], types, dtype)
+    yield BINARY_TRAILER
+
+
+def copy_frame(
+    conn,
+    df: pd.DataFrame,
+    table: str,
+    truncate: bool = False,
+    fmt: str | None = None,
+    chunk_rows: int | None = None,
+    date_format: str = "%Y-%m-%d",
+    quiet: bool = False,
+    freeze: bool = False,
+) -> dict:
+    """COPY `df` into `table` (columns named after the frame) without touching disk.
+
+    fmt="binary" uses the PG binary wire format (fixed-width typed columns, no NULLs);
+    "auto" picks binary when the table allows it and falls back to CSV otherwise.
+    freeze=True adds COPY's FREEZE option (table truncated in the same transaction).
+    Returns load stats (rows, bytes, seconds, client CPU seconds, rows/s, bytes/s).
+    """
+    fmt = (fmt or COPY_FORMAT).lower()
+    chunk_rows = chunk_rows or COPY_CHUNK_ROWS
+    cols = ", ".join(df.columns)
+
+    dtype = None
+    if fmt in ("auto", "binary"):
+        types = column_types(conn, table)
+        dtype = _binary_dtype(df, types)
+        if dtype is not None and df.isna().to_numpy().any():
+            dtype = None
+        if dtype is None and fmt == "binary":
+            raise ValueError(f"{table}: frame can't be sent as binary COPY")
+
+    if dtype is not None:
+        fmt = "binary"
+        stream = ChunkStream(_binary_chunks(df, types, dtype, chunk_rows))
+    else:
+        fmt = "csv"
+        stream = ChunkStream(_csv_chunks(df, chunk_rows, date_format))
+
+    t0, c0 = time.perf_counter(), time.thread_time()
+    with conn.cursor() as cur:
+        if truncate:
+            cur.execute(f"TRUNCATE TABLE {table} RESTART IDENTITY;")
+        options = f"FORMAT {fmt.upper()}" + (", FREEZE" if freeze else "")
+        cur.copy_expert(
+            f"COPY {table} ({cols}) FROM STDIN WITH ({options})",
+            stream,
+            size=1 << 20,
+        )
+    secs = max(time.perf_counter() - t0, 1e-9)
+    cpu = time.thread_time() - c0
+
+    stats = {
+        "table": table,
+        "format": fmt,
+        "rows": len(df),
+        "bytes": stream.nbytes,
+        "seconds": round(secs, 3),
+        "cpu_seconds": round(cpu, 3),
+        "rows_per_s": round(len(df) / secs, 1),
+        "bytes_per_s": round(stream.nbytes / secs, 1),
+    }
+    if not quiet:
+        print(
+            f"Loaded {table}: {len(df)} rows ({fmt}, {stream.nbytes / 1e6:.1f} MB) in "
+            f"{secs:.2f}s — {stats['rows_per_s']:,.0f} rows/s, "
+            f"{stats['bytes_per_s'] / 1e6:.1f} MB/s"
+        )
+    return stats
+
+
+def verify_counts(
+    conn, sent: dict[str, int], filters: dict[str, tuple[str, tuple]] | None = None
+) -> dict[str, int]:
+    """Consistency checkpoint: raise if a table's row count differs from what was sent.
+
+    `filters` maps table -> (SQL predicate, params) to count only this run's rows,
+    e.g. ("date_id > %s", (watermark,)) when appending to existing data.
+    """
+    counts = {}
+    filters = filters or {}
+    with conn.cursor() as cur:
+        for table, expected in sent.items():
+            where, params = filters.get(table, ("TRUE", ()))
+            cur.execute(f"SELECT count(*) FROM {table} WHERE {where};", params)
+            counts[table] = cur.fetchone()[0]
+            if counts[table] != expected:
+                raise RuntimeError(f"{table}: expected {expected} rows, found {counts[table]}")
+    print(f"Consistency checkpoint OK: {len(counts)} tables, {sum(counts.values())} rows")
+    return counts
+
+
+class ParallelLoader:
+    """Fan COPY jobs out over a small pool of connections (one per worker thread).
+
+    Frames bigger than `split_rows` are cut into slices so one large table can load
+    over several connections at once. Use `verify()` at the end as the consistency
+    checkpoint: it compares table row counts with everything this loader sent.
+    """
+
+    def __init__(self, connect: Callable, connections: int = 1, split_rows: int | None = None):
+        self.connect = connect
+        self.connections = max(1, connections)
+        self.split_rows = split_rows or LOAD_SPLIT_ROWS
+        self.sent: dict[str, int] = defaultdict(int)
+        self._local = threading.local()
+        self._conns: list = []
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.connections)
+
+    def _conn(self):
+        if not hasattr(self._local, "conn"):
+            self._local.conn = self.connect()
+            with self._lock:
+                self._conns.append(self._local.conn)
+        return self._local.conn
+
+    def _copy(self, df: pd.DataFrame, table: str) -> dict:
+        start = time.perf_counter()
+        stats = copy_frame(self._conn(), df, table, quiet=True)
+        stats["span"] = (start, time.perf_counter())
+        return stats
+
+    def load(self, frames: dict[str, pd.DataFrame]) -> list[dict]:
+        """COPY every frame (already-truncated targets), concurrently; report per table."""
+        t0 = time.perf_counter()
+        slices = [
+            (df.iloc[start : start + self.split_rows], table)
+            for table, df in frames.items()
+            for start in range(0, len(df), self.split_rows)
+        ]
+        stats = list(self._pool.map(lambda job: self._copy(*job), slices))
+        return self._report(stats, t0)
+
+    def load_each(self, jobs: Iterable[tuple[str, Callable[[], pd.DataFrame]]]) -> list[dict]:
+        """Like load(), but each job builds its frame on the worker thread (e.g. reads a file)."""
+        t0 = time.perf_counter()
+        stats = list(self._pool.map(lambda job: self._copy(job[1](), job[0]), jobs))
+        return self._report(stats, t0)
+
+    def _report(self, stats: list[dict], t0: float) -> list[dict]:
+        wall = max(time.perf_counter() - t0, 1e-9)
+        per_table: dict[str, dict] = {}
+        for st in stats:
+            agg = per_table.setdefault(
+                st["table"], {"rows": 0, "bytes": 0, "slices": 0, "start": st["span"][0], "end": 0}
+            )
+            agg["rows"] += st["rows"]
+            agg["bytes"] += st["bytes"]
+            agg["slices"] += 1
+            agg["start"] = min(agg["start"], st["span"][0])
+            agg["end"] = max(agg["end"], st["span"][1])
+        for table, agg in per_table.items():
+            self.sent[table] += agg["rows"]
+            # Slices of one table overlap, so rate over its wall span, not summed COPY time.
+            secs = max(agg["end"] - agg["start"], 1e-9)
+            print(
+                f"Loaded {table}: {agg['rows']} rows ({agg['bytes'] / 1e6:.1f} MB) in "
+                f"{agg['slices']} slice(s), {secs:.2f}s — {agg['rows'] / secs:,.0f} rows/s, "
+                f"{agg['bytes'] / secs / 1e6:.1f} MB/s"
+            )
+        total_rows = sum(a["rows"] for a in per_table.values())
+        total_bytes = sum(a["bytes"] for a in per_table.values())
+        print(
+            f"Batch over {self.connections} connection(s): {total_rows} rows, "
+            f"{total_bytes / 1e6:.1f} MB in {wall:.2f}s — {total_rows / wall:,.0f} rows/s"
+        )
+        return stats
+
+    def verify(self, conn, filters: dict | None = None) -> dict[str, int]:
+        return verify_counts(conn, self.sent, filters)
+
+    def close(self):
+        self._pool.shutdown()
+        for conn in self._conns:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BulkLoad:
+    """Reload `tables` in one transaction, bounded by COPY speed rather than index upkeep.
+
+    On enter: TRUNCATE, then drop secondary indexes and FKs (definitions are kept).
+    load() COPYs with FREEZE, since the tables were truncated in this transaction.
+    On exit: rebuild indexes and FKs, COMMIT, then ANALYZE. Tables in `unlogged` are
+    made UNLOGGED and stay that way: no WAL for them at all, and Postgres empties them
+    after a crash (fine for re-generable rps_raw). Other tables that an earlier run left
+    UNLOGGED are set back to LOGGED. A switch back at commit would WAL-log the whole
+    heap anyway, so a temporary one could never beat a logged COPY FREEZE.
+    """
+
+    def __init__(self, conn, tables: list[str], unlogged: list[str] | None = None):
+        self.conn = conn
+        self.tables = tables
+        self.unlogged = unlogged or []
+        self.sent: dict[str, int] = defaultdict(int)
+        self._indexes: list[tuple[str, str]] = []
+        self._fks: list[tuple[str, str, str]] = []
+        self._unlogged_now: set[str] = set()
+
+    def __enter__(self):
+        self._autocommit = self.conn.autocommit
+        self.conn.autocommit = False
+        with self.conn.cursor() as cur:
+            for table in self.tables:
+                cur.execute(
+                    """
+                    SELECT quote_ident(n.nspname) || '.' || quote_ident(c.relname),
+                           pg_get_indexdef(i.indexrelid)
+                    FROM pg_index i
+                    JOIN pg_class c ON c.oid = i.indexrelid
+                    JOIN pg_namespace n ON n.oid = c.relnamespace
+                    WHERE i.indrelid = %s::regclass
+                      AND NOT EXISTS (
+                          SELECT 1 FROM pg_constraint k WHERE k.conindid = i.indexrelid
+                      )
+                    """,
+                    (table,),
+                )
+                self._indexes += cur.fetchall()
+                cur.execute(
+                    """
+                    SELECT quote_ident(conname), pg_get_constraintdef(oid)
+                    FROM pg_constraint
+                    WHERE conrelid = %s::regclass AND contype = 'f'
+                    """,
+                    (table,),
+                )
+                self._fks += [(table, name, ddl) for name, ddl in cur.fetchall()]
+                cur.execute(
+                    "SELECT relpersistence FROM pg_class WHERE oid = %s::regclass", (table,)
+                )
+                if cur.fetchone()[0] == "u":
+                    self._unlogged_now.add(table)
+
+            cur.execute(f"TRUNCATE TABLE {', '.join(self.tables)} RESTART IDENTITY;")
+            for table in self.tables:
+                # after TRUNCATE, so the rewrite is of an empty table
+                unlogged = table in self.unlogged
+                if unlogged != (table in self._unlogged_now):
+                    cur.execute(f"ALTER TABLE {table} SET {'UNLOGGED' if unlogged else 'LOGGED'};")
+            for table, name, _ in self._fks:
+                cur.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name};")
+            for name, _ in self._indexes:
+                cur.execute(f"DROP INDEX {name};")
+        print(
+            f"Bulk mode: truncated {len(self.tables)} tables, deferred "
+            f"{len(self._indexes)} indexes and {len(self._fks)} FKs"
+        )
+        return self
+
+    def load(self, frames: dict[str, pd.DataFrame]) -> list[dict]:
+        stats = [copy_frame(self.conn, df, table, freeze=True) for table, df in frames.items()]
+        for st in stats:
+            self.sent[st["table"]] += st["rows"]
+        return stats
+
+    def verify(self, conn, filters: dict | None = None) -> dict[str, int]:
+        return verify_counts(conn, self.sent, filters)
+
+    def __exit__(self, exc_type, *exc):
+        try:
+            if exc_type is not None:
+                self.conn.rollback()
+                return
+            t0 = time.perf_counter()
+            try:
+                with self.conn.cursor() as cur:
+                    for _, ddl in self._indexes:
+                        cur.execute(ddl)
+                    for table, name, ddl in self._fks:
+                        cur.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {ddl};")
+                self.conn.commit()
+            except Exception:
+                # leave the aborted transaction, or restoring autocommit below masks the error
+                self.conn.rollback()
+                raise
+            print(f"Bulk mode: rebuilt indexes/FKs in {time.perf_counter() - t0:.2f}s")
+        finally:
+            self.conn.autocommit = self._autocommit
+        # only reached after a successful commit
+        with self.conn.cursor() as cur:
+            cur.execute(f"ANALYZE {', '.join(self.tables)};")
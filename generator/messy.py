@@ -1,7 +1,10 @@
 # generator/messy.py
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+
 import numpy as np
 import pandas as pd
-from typing import Iterable
 
 DEFAULT_SRC = "erp"
 
@@ -32,6 +35,62 @@ def add_lineage(
     return out
 
 
+# Format codes for messy_numeric (one drawn per corrupted cell)
+NUM_FORMATS = ("plain", "thousands", "integer", "comma_decimal", "empty", "null")
+_PAD2 = np.array([f"{i:02d}" for i in range(100)])
+_PAD3 = np.array([f"{i:03d}" for i in range(1000)])
+
+
+def _with_commas(n: np.ndarray) -> np.ndarray:
+    """Non-negative ints -> strings with ',' thousands separators (vectorized per group)."""
+    rest = n // 1000
+    out = np.where(rest > 0, _PAD3[n % 1000], (n % 1000).astype(str)).astype(object)
+    while (rest > 0).any():
+        nxt = rest // 1000
+        head = np.where(nxt > 0, _PAD3[rest % 1000], (rest % 1000).astype(str))
+        out = np.where(rest > 0, head.astype(object) + "," + out, out)
+        rest = nxt
+    return out
+
+
+def format_numeric(values: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """Render floats per format code (index into NUM_FORMATS), one block per format.
+
+    Matches f"{x:.2f}", f"{x:,.2f}", str(int(round(x))), comma-decimal, "" and "NULL"
+    (cents are rounded from x * 100, so exact half-cent ties may differ by 0.01).
+    """
+    x = np.asarray(values, dtype=np.float64)
+    out = np.empty(len(x), dtype=object)
+    nan = np.isnan(x)
+    safe = np.where(nan, 0.0, x)
+    cents = np.rint(np.abs(safe) * 100).astype(np.int64)
+    sign = np.where(np.signbit(safe), "-", "").astype(object)
+    whole, frac = np.divmod(cents, 100)
+    frac_s = _PAD2[frac].astype(object)
+
+    for code, name in enumerate(NUM_FORMATS):
+        sel = codes == code
+        if not sel.any():
+            continue
+        if name == "plain":
+            block = sign[sel] + whole[sel].astype(str).astype(object) + "." + frac_s[sel]
+        elif name == "thousands":
+            block = sign[sel] + _with_commas(whole[sel]) + "." + frac_s[sel]
+        elif name == "comma_decimal":
+            block = sign[sel] + whole[sel].astype(str).astype(object) + "," + frac_s[sel]
+        elif name == "integer":
+            block = np.rint(safe[sel]).astype(np.int64).astype(str).astype(object)
+        elif name == "empty":
+            block = ""
+        else:
+            block = "NULL"
+        out[sel] = block
+    # NaN keeps the old f-string behaviour ("nan"), except the integer format ("0")
+    out[nan & (codes <= 3) & (codes != 2)] = "nan"
+    out[nan & (codes == 2)] = "0"
+    return out
+
+
 def messy_numeric(
     df: pd.DataFrame, cols: Iterable[str], rate: float, rng: np.random.Generator
 ) -> pd.DataFrame:
@@ -40,49 +99,55 @@ def messy_numeric(
     for col in cols:
         if col not in out.columns:
             continue
-        n = len(out)
-        m = _rand_mask(n, rate, rng)
-        noisy = out.loc[m, col].astype(float)
-        formatted = noisy.map(
-            lambda x: np.random.choice(
-                [
-                    f"{x:.2f}",
-                    f"{x:,.2f}",  # thousands separator
-                    str(int(round(x))) if x == x else "0",
-                    f"{x:.2f}".replace(".", ","),  # comma decimal
-                    "",  # empty
-                    "NULL",
-                ]
-            )
-        )
-        out.loc[m, col] = formatted
+        m = _rand_mask(len(out), rate, rng)
+        codes = rng.integers(0, len(NUM_FORMATS), size=int(m.sum()))
+        vals = out[col].to_numpy(dtype=object)
+        vals[m] = format_numeric(pd.to_numeric(out.loc[m, col]).to_numpy(float), codes)
+        out[col] = vals
     return out
 
 
-def messy_dates(
-    df: pd.DataFrame, col: str, rate: float, rng: np.random.Generator
-) -> pd.DataFrame:
+# Layouts messy_dates picks from (the last one mimics a timestamp export)
+DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y", "%m/%d/%Y", "%Y-%m-%d 00:00:00")
+
+
+def format_dates(dates: pd.Series, codes: np.ndarray) -> np.ndarray:
+    """Render parsed dates per format code (index into DATE_FORMATS).
+
+    Each distinct (day, layout) string is built once from year/month/day parts and
+    shared by every row that uses it, instead of one new string per row.
+    """
+    days, inv = np.unique(dates.to_numpy(dtype="datetime64[D]"), return_inverse=True)
+    parts = pd.DatetimeIndex(days)
+    y = parts.year.to_numpy().astype(str).astype(object)
+    mo = _PAD2[parts.month.to_numpy()].astype(object)
+    d = _PAD2[parts.day.to_numpy()].astype(object)
+    table = np.empty((len(DATE_FORMATS), len(days)), dtype=object)
+    for code, fmt in enumerate(DATE_FORMATS):
+        if fmt == "%d.%m.%Y":
+            table[code] = d + "." + mo + "." + y
+        elif fmt == "%m/%d/%Y":
+            table[code] = mo + "/" + d + "/" + y
+        else:
+            iso = y + "-" + mo + "-" + d
+            table[code] = iso + " 00:00:00" if fmt.endswith("00:00:00") else iso
+    return table[np.asarray(codes, dtype=np.int64), inv]
+
+
+def messy_dates(df: pd.DataFrame, col: str, rate: float, rng: np.random.Generator) -> pd.DataFrame:
     """Shuffle date formats: YYYY-MM-DD, DD.MM.YYYY, MM/DD/YYYY, or timestamp-like."""
     if col not in df.columns:
         return df
     out = df.copy()
-    n = len(out)
-    m = _rand_mask(n, rate, rng)
-
-    def fmt(x):
-        try:
-            d = pd.to_datetime(x).date()
-        except Exception:
-            return x
-        choices = [
-            d.strftime("%Y-%m-%d"),
-            d.strftime("%d.%m.%Y"),
-            d.strftime("%m/%d/%Y"),
-            f"{d} 00:00:00",
-        ]
-        return np.random.choice(choices)
-
-    out.loc[m, col] = out.loc[m, col].map(fmt)
+    m = _rand_mask(len(out), rate, rng)
+    codes = rng.integers(0, len(DATE_FORMATS), size=int(m.sum()))
+    vals = out[col].to_numpy(dtype=object)
+    # Parse once; values that don't parse are left as they are
+    parsed = pd.to_datetime(out.loc[m, col], format="ISO8601", errors="coerce")
+    ok = parsed.notna().to_numpy()
+    idx = np.flatnonzero(m)[ok]
+    vals[idx] = format_dates(parsed[ok], codes[ok])
+    out[col] = vals
     return out
 
 
@@ -96,16 +161,11 @@ def inject_dupes(
     k = max(1, int(rate * n))
     sample = df.iloc[rng.choice(n, size=min(k, n), replace=False)].copy()
     # Add small noise to the first non-key numeric col we find
-    num_cols = [
-        c
-        for c in df.columns
-        if c not in key_cols and pd.api.types.is_numeric_dtype(df[c])
-    ]
+    num_cols = [c for c in df.columns if c not in key_cols and pd.api.types.is_numeric_dtype(df[c])]
     if num_cols:
         c = num_cols[0]
         sample[c] = (
-            pd.to_numeric(sample[c], errors="coerce")
-            * (1 + rng.normal(0, 0.05, size=len(sample)))
+            pd.to_numeric(sample[c], errors="coerce") * (1 + rng.normal(0, 0.05, size=len(sample)))
         ).round(2)
     # Return concat → same keys duplicated
     return pd.concat([df, sample], ignore_index=True)
@@ -121,5 +181,137 @@ def inject_fk_breaks(
             continue
         n = len(out)
         m = _rand_mask(n, rate, rng)
+        out[col] = out[col].astype(object)
         out.loc[m, col] = rng.integers(900000, 999999, size=m.sum()).astype(str)
     return out
+
+
+def _text(values: np.ndarray) -> np.ndarray:
+    """Numbers -> str the way as_text renders them (NaN -> None).
+
+    Each distinct value is rendered once and the string object is shared by every row
+    holding it: keys, counts and per-series prices repeat a lot, so most rows cost an
+    8-byte pointer instead of their own ~50-byte str.
+    """
+    codes, uniq = pd.factorize(values, use_na_sentinel=True)
+    out = np.append(uniq.astype(str).astype(object), None)
+    return out[codes]  # code -1 (NaN) picks the trailing None
+
+
+@dataclass(frozen=True)
+class MessPipeline:
+    """Declarative raw-feed corruption, applied in one pass over one set of buffers.
+
+    Same mess as chaining messy_numeric, inject_fk_breaks, messy_dates, inject_dupes,
+    as_text and add_lineage, but every column is rendered straight to its TEXT buffer
+    once, duplicates are gathered by row index at the end, and no intermediate
+    DataFrame copies are made. Duplicates get a ±5% wobble on the first numeric column
+    (where that cell is still clean), so they conflict like late-arriving corrections.
+    With `batch_days`, rows are split into files by date: source_file becomes
+    <source_system>_<stem>_<YYYYMMDD>.csv for the first day of each batch.
+    """
+
+    numeric: tuple[str, ...] = ()
+    date: str | None = "date_id"
+    fks: tuple[str, ...] = ()
+    dupe_keys: tuple[str, ...] = ()
+    rate_types: float = 0.0
+    rate_dates: float = 0.0
+    rate_fk: float = 0.0
+    rate_dupes: float = 0.0
+    source_system: str = DEFAULT_SRC
+    source_file: str | None = None
+    batch_days: int = 0
+
+    def batch_files(self, dates: pd.Series) -> np.ndarray:
+        """Per-row source_file for `batch_days`-day batches (one shared str per batch)."""
+        days = dates.to_numpy(dtype="datetime64[D]")
+        first = days - days.astype(np.int64) % self.batch_days
+        starts, inv = np.unique(first, return_inverse=True)
+        stem = os.path.splitext(self.source_file or "batch.csv")[0]
+        names = [f"{self.source_system}_{stem}_{d:%Y%m%d}.csv" for d in starts.astype(object)]
+        return np.array(names, dtype=object)[inv]
+
+    def _mess_numeric(
+        self, df: pd.DataFrame, cols: dict[str, np.ndarray], rng: np.random.Generator
+    ) -> dict[str, np.ndarray]:
+        """Reformat a `rate_types` share of each numeric column in place; return clean masks."""
+        clean: dict[str, np.ndarray] = {}
+        for c in self.numeric:
+            if c not in cols:
+                continue
+            m = _rand_mask(len(df), self.rate_types, rng)
+            codes = rng.integers(0, len(NUM_FORMATS), size=int(m.sum()))
+            cols[c][m] = format_numeric(df[c].to_numpy(dtype=np.float64)[m], codes)
+            clean[c] = ~m
+        return clean
+
+    def _break_fks(self, cols: dict[str, np.ndarray], rng: np.random.Generator):
+        """Point a `rate_fk` share of each FK column at ids no dimension has."""
+        for c in self.fks:
+            if c not in cols:
+                continue
+            m = _rand_mask(len(cols[c]), self.rate_fk, rng)
+            cols[c][m] = rng.integers(900000, 999999, size=int(m.sum())).astype(str)
+
+    def _mess_dates(self, dates: pd.Series, rng: np.random.Generator) -> np.ndarray:
+        """Render the date column, a `rate_dates` share in one of the other formats."""
+        n = len(dates)
+        m = _rand_mask(n, self.rate_dates, rng)
+        codes = np.zeros(n, dtype=np.int64)
+        codes[m] = rng.integers(0, len(DATE_FORMATS), size=int(m.sum()))
+        return format_dates(dates, codes)
+
+    def _add_dupes(
+        self,
+        df: pd.DataFrame,
+        cols: dict[str, np.ndarray],
+        clean: dict[str, np.ndarray],
+        files: np.ndarray | None,
+        rng: np.random.Generator,
+    ) -> tuple[dict[str, np.ndarray], np.ndarray | None]:
+        """Append a `rate_dupes` share of rows again, wobbling the first clean numeric."""
+        n = len(df)
+        k = min(max(1, int(self.rate_dupes * n)), n)
+        dup = rng.choice(n, size=k, replace=False)
+        rows = np.concatenate([np.arange(n), dup])
+        cols = {c: v[rows] for c, v in cols.items()}
+        files = files[rows] if files is not None else None
+        wobble = [c for c in self.numeric if c in clean and c not in self.dupe_keys][:1]
+        for c in wobble:
+            ok = clean[c][dup]
+            vals = df[c].to_numpy()[dup]
+            noisy = (vals * (1 + rng.normal(0, 0.05, size=k))).round(2)
+            if vals.dtype.kind in "iu":
+                noisy = noisy.round().astype(vals.dtype)
+            tail = cols[c][n:]
+            tail[ok] = _text(noisy[ok])
+        return cols, files
+
+    def apply(self, df: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
+        """Corrupt `df` and return TEXT columns (plus lineage) ready for COPY into rps_raw."""
+        cols: dict[str, np.ndarray] = {}
+        for c in df.columns:
+            if c == self.date:
+                continue
+            vals = df[c].to_numpy()
+            cols[c] = _text(vals) if vals.dtype.kind in "iuf" else vals.astype(object)
+
+        # Steps draw from `rng` in this order: numerics, FKs, dates, dupes
+        clean = self._mess_numeric(df, cols, rng)
+        self._break_fks(cols, rng)
+        files = None
+        if self.date in df.columns:
+            dates = pd.to_datetime(df[self.date])
+            if self.batch_days:
+                files = self.batch_files(dates)
+            cols[self.date] = self._mess_dates(dates, rng)
+        if len(df) and self.rate_dupes > 0:
+            cols, files = self._add_dupes(df, cols, clean, files, rng)
+
+        out = pd.DataFrame({c: cols[c] for c in df.columns}, copy=False)
+        out["source_system"] = self.source_system
+        out["source_file"] = (
+            files if files is not None else self.source_file or f"{self.source_system}_batch.csv"
+        )
+        return out
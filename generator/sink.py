@@ -0,0 +1,171 @@
+# generator/sink.py
+# File sink: dims, facts and raw tables as date-partitioned Parquet / Arrow IPC datasets.
+import glob
+import json
+import os
+import shutil
+import time
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+SINK_FORMAT = os.getenv("SINK_FORMAT", "parquet").lower()  # parquet | ipc
+SINK_PARTITION = os.getenv("SINK_PARTITION", "month").lower()  # month | year | none
+MANIFEST = "_manifest.json"
+_EXT = {"parquet": "parquet", "ipc": "arrow"}
+_PARTITION_UNITS = {"month": "datetime64[M]", "year": "datetime64[Y]"}
+
+
+def _arrow():
+    """pyarrow is only needed for file output, so import it on first use."""
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+    except ImportError as exc:
+        raise RuntimeError("file output needs pyarrow (see generator/requirements.txt)") from exc
+    return pa, ds
+
+
+def table_dir(root: str, table: str) -> str:
+    """rps_core.fct_sales -> <root>/rps_core/fct_sales"""
+    return os.path.join(root, *table.split(".", 1))
+
+
+def data_files(root: str, table: str, fmt: str = "parquet") -> list[str]:
+    """All part files of one table, partition directories included."""
+    pattern = os.path.join(table_dir(root, table), "**", f"*.{_EXT[fmt]}")
+    return sorted(glob.glob(pattern, recursive=True))
+
+
+def arrow_table(df: pd.DataFrame):
+    """Frame -> Arrow table with compact types: date32 dates, int32 where values fit."""
+    pa, _ = _arrow()
+    arrays = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if values.dtype.kind == "M":
+            arrays[col] = pa.array(values.astype("datetime64[D]"), pa.date32())
+        elif values.dtype.kind in "iu" and len(values):
+            info = np.iinfo(np.int32)
+            fits = values.min() >= info.min and values.max() <= info.max
+            arrays[col] = pa.array(values, pa.int32() if fits else pa.int64())
+        else:
+            arrays[col] = pa.array(values, from_pandas=True)
+    return pa.table(arrays)
+
+
+def read_file(path: str, fmt: str = "parquet") -> pd.DataFrame:
+    """One data file (no partition columns) back as a frame."""
+    _, ds = _arrow()
+    return ds.dataset(path, format=fmt).to_table().to_pandas(date_as_object=False)
+
+
+class FileSink:
+    """Loader-shaped sink (load / verify / sent) that writes datasets under `root`.
+
+    Each table lands in <root>/<schema>/<table>/. Facts with a typed date_id are
+    hive-partitioned by month (or year: SINK_PARTITION); the messy raw tables keep
+    date_id as text, so they are written unpartitioned. Every load() call adds new part
+    files, so streaming one product chunk at a time never rewrites earlier output.
+    On exit a _manifest.json records row counts for the companion loader.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        tables: list[str],
+        fmt: str | None = None,
+        partition: str | None = None,
+        meta: dict | None = None,
+    ):
+        self.root = root
+        self.tables = tables
+        self.fmt = (fmt or SINK_FORMAT).lower()
+        self.partition = (partition or SINK_PARTITION).lower()
+        if self.fmt not in _EXT:
+            raise ValueError(f"SINK_FORMAT must be one of {sorted(_EXT)}, got {self.fmt!r}")
+        self.meta = meta or {}
+        self.sent: dict[str, int] = defaultdict(int)
+        self._batch = 0
+
+    def __enter__(self):
+        # Like TRUNCATE: start every target table from an empty directory
+        for table in self.tables:
+            shutil.rmtree(table_dir(self.root, table), ignore_errors=True)
+        os.makedirs(self.root, exist_ok=True)
+        return self
+
+    def _write(self, df: pd.DataFrame, table: str) -> dict:
+        pa, ds = _arrow()
+        t0, c0 = time.perf_counter(), time.thread_time()
+        data = arrow_table(df)
+        partitioning = None
+        unit = _PARTITION_UNITS.get(self.partition)
+        is_dim = table.rsplit(".", 1)[-1].startswith("dim_")
+        if unit and not is_dim and "date_id" in df and df["date_id"].dtype.kind == "M":
+            # date_month=2024-03 (or date_year=2024) directories
+            part = f"date_{self.partition}"
+            keys = df["date_id"].to_numpy().astype(unit).astype(str)
+            data = data.append_column(part, pa.array(keys))
+            partitioning = ds.partitioning(data.select([part]).schema, flavor="hive")
+        written = []
+        options = None
+        if self.fmt == "parquet":
+            options = ds.ParquetFileFormat().make_write_options(compression="zstd")
+        ds.write_dataset(
+            data,
+            table_dir(self.root, table),
+            format=self.fmt,
+            partitioning=partitioning,
+            basename_template=f"part-{self._batch:05d}-{{i}}.{_EXT[self.fmt]}",
+            existing_data_behavior="overwrite_or_ignore",
+            file_options=options,
+            file_visitor=lambda f: written.append(os.path.getsize(f.path)),
+        )
+        secs = max(time.perf_counter() - t0, 1e-9)
+        return {
+            "table": table,
+            "format": self.fmt,
+            "rows": len(df),
+            "bytes": sum(written),
+            "files": len(written),
+            "seconds": round(secs, 3),
+            "cpu_seconds": round(time.thread_time() - c0, 3),
+            "rows_per_s": round(len(df) / secs, 1),
+        }
+
+    def load(self, frames: dict[str, pd.DataFrame]) -> list[dict]:
+        stats = [self._write(df, table) for table, df in frames.items() if len(df)]
+        self._batch += 1
+        for st in stats:
+            self.sent[st["table"]] += st["rows"]
+            print(
+                f"Wrote {st['table']}: {st['rows']} rows in {st['files']} file(s) "
+                f"({st['bytes'] / 1e6:.1f} MB) in {st['seconds']:.2f}s"
+            )
+        return stats
+
+    def verify(self, conn=None, filters: dict | None = None) -> dict[str, int]:
+        """Consistency checkpoint: re-count the rows on disk against what was written."""
+        _, ds = _arrow()
+        counts = {}
+        for table, expected in self.sent.items():
+            found = ds.dataset(table_dir(self.root, table), format=self.fmt).count_rows()
+            counts[table] = found
+            if found != expected:
+                raise RuntimeError(f"{table}: expected {expected} rows, found {found}")
+        print(f"Consistency checkpoint OK: {len(counts)} tables, {sum(counts.values())} rows")
+        return counts
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is not None:
+            return
+        manifest = {
+            **self.meta,
+            "format": self.fmt,
+            "partition": self.partition,
+            "tables": {t: self.sent.get(t, 0) for t in self.tables},
+        }
+        with open(os.path.join(self.root, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=2)
@@ -0,0 +1,467 @@
+# generator/synth.py
+# Columnar builders for the rps_core fact frames (no per-row Python loops).
+import numpy as np
+import pandas as pd
+
+# Compact in-memory schema: dim keys are small SERIALs, counts fit int32, and float32
+# (~7 significant digits) is only used where values stay well below 1e5 with 2 decimals.
+# Money that gets summed or reconciled (gross, rebate, spend) stays float64.
+KEY_DTYPES = {
+    "product_id": np.int32,
+    "region_id": np.int16,
+    "channel_id": np.int16,
+    "payer_id": np.int16,
+}
+COUNT_DTYPE = np.int32
+SMALL_FLOAT = np.float32
+
+
+def compact_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast whichever dim key columns `df` has to KEY_DTYPES (no copy if already there)."""
+    keys = {c: t for c, t in KEY_DTYPES.items() if c in df and df[c].dtype != t}
+    return df.astype(keys, copy=False) if keys else df
+
+
+SALES_COLS = [
+    "date_id",
+    "product_id",
+    "region_id",
+    "channel_id",
+    "units",
+    "list_price_chf",
+    "gross_sales_chf",
+]
+
+
+def series_prices(
+    product_ids: np.ndarray, n_regions: int, n_channels: int, seed: int
+) -> np.ndarray:
+    """List price per product × region × channel, keyed on (seed, product_id).
+
+    Independent of which days are generated, so append runs reproduce the prices of
+    the initial load without reading them back.
+    """
+    return (
+        np.stack(
+            [
+                np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(int(pid),))).uniform(
+                    120.0, 350.0, size=(n_regions, n_channels)
+                )
+                for pid in product_ids
+            ]
+        )
+        .reshape(len(product_ids), n_regions, n_channels)
+        .astype(SMALL_FLOAT)
+    )
+
+
+def sales_frame(
+    days: pd.Series,
+    prod: pd.DataFrame,
+    region_ids: np.ndarray,
+    channel_ids: np.ndarray,
+    base_mu: float,
+    rng: np.random.Generator,
+    prices: np.ndarray | None = None,
+    origin: pd.Timestamp | None = None,
+    horizon: int | None = None,
+) -> pd.DataFrame:
+    """Build fct_sales for the product × region × channel × day grid in one shot.
+
+    Each product starts selling 4 weeks after launch. The trend is a linear ramp
+    (0.5 → 1.2) and two seasonal cycles across each series' active part of the initial
+    load: `horizon` days from `origin` (default: `days` itself). It is a function of the
+    date only, so a later run over newer days continues the same curve (held at the
+    1.2 cap). Per series we draw a lognormal base and multiplicative noise; list
+    prices come from `prices` (P × R × C) or are drawn from `rng`. Rows come out
+    ordered by product, region, channel, date.
+    """
+    day_arr = pd.to_datetime(days).to_numpy(dtype="datetime64[D]")
+    origin = np.datetime64(pd.Timestamp(origin if origin is not None else days.iloc[0]), "D")
+    horizon = horizon or len(day_arr)
+    launch = pd.to_datetime(prod["launch_date"]).to_numpy(dtype="datetime64[D]")
+    start = launch + np.timedelta64(28, "D")
+    active = day_arr[None, :] >= start[:, None]
+    # Series start inside the initial load: the older ones at its first day
+    anchor = np.maximum(start, origin)
+    span = horizon - (anchor - origin).astype(np.int64)
+    k = (day_arr[None, :] - anchor[:, None]).astype(np.int64)
+    frac = np.maximum(k, 0) / np.maximum(span - 1, 1)[:, None]
+
+    n_p, n_d = active.shape
+    n_r, n_c = len(region_ids), len(channel_ids)
+    shape = (n_p, n_r, n_c, n_d)
+
+    season = np.sin(4 * np.pi * frac) * 0.1
+    ramp = np.clip(0.5 + 0.7 * frac, 0.5, 1.2)
+    trend = (ramp * (1 + season))[:, None, None, :]
+
+    base = rng.lognormal(mean=np.log(base_mu), sigma=0.4, size=shape)
+    noise = rng.normal(1.0, 0.08, size=shape)
+    if prices is None:
+        prices = rng.uniform(120.0, 350.0, size=(n_p, n_r, n_c)).astype(SMALL_FLOAT)
+    price = prices.astype(SMALL_FLOAT)
+
+    units = np.maximum(0, base * trend * noise).astype(COUNT_DTYPE)
+    # gross from the stored (float32) list price, in float64, so units × price reconciles
+    gross = (units * price.astype(np.float64)[..., None]).round(2)
+
+    mask = np.broadcast_to(active[:, None, None, :], shape)
+    p_idx, r_idx, c_idx, d_idx = np.nonzero(mask)
+    return pd.DataFrame(
+        {
+            "date_id": day_arr[d_idx].astype("datetime64[ns]"),
+            "product_id": prod["product_id"].to_numpy(dtype=KEY_DTYPES["product_id"])[p_idx],
+            "region_id": np.asarray(region_ids, dtype=KEY_DTYPES["region_id"])[r_idx],
+            "channel_id": np.asarray(channel_ids, dtype=KEY_DTYPES["channel_id"])[c_idx],
+            "units": units[mask],
+            "list_price_chf": price[p_idx, r_idx, c_idx],
+            "gross_sales_chf": gross[mask],
+        },
+        columns=SALES_COLS,
+    )
+
+
+REBATE_COLS = ["date_id", "product_id", "payer_id", "region_id", "rebate_chf"]
+
+
+def payer_share_matrix(
+    reg: pd.DataFrame, pay: pd.DataFrame, shares: dict | None = None
+) -> np.ndarray:
+    """Cumulative payer probabilities per region (rows follow `reg`, columns follow `pay`).
+
+    `shares` maps canton -> {payer_name: weight}; the optional "default" entry covers
+    cantons that are not listed. Without any weights every payer is equally likely.
+    """
+    shares = shares or {}
+    names = pay["payer_name"].tolist()
+    fallback = shares.get("default")
+    w = np.ones((len(reg), len(names)))
+    for i, canton in enumerate(reg["canton"]):
+        mix = shares.get(canton, fallback)
+        if mix:
+            w[i] = [float(mix.get(n, 0.0)) for n in names]
+    w = np.where(w.sum(axis=1, keepdims=True) > 0, w, 1.0)
+    cum = np.cumsum(w / w.sum(axis=1, keepdims=True), axis=1)
+    cum[:, -1] = 1.0
+    return cum
+
+
+def rebates_frame(
+    s_df: pd.DataFrame,
+    reg: pd.DataFrame,
+    pay: pd.DataFrame,
+    rng: np.random.Generator,
+    shares: dict | None = None,
+    pct_range: tuple[float, float] = (0.05, 0.22),
+) -> pd.DataFrame:
+    """Rebates per day × product × region × payer, the business key staging dedupes on.
+
+    Each sales row draws a payer from its canton's payer mix and a pct ~ U(pct_range);
+    rows that land on the same payer (e.g. from two channels) are summed.
+    """
+    n = len(s_df)
+    cum = payer_share_matrix(reg, pay, shares)
+    reg_pos = pd.Index(reg["region_id"]).get_indexer(s_df["region_id"])
+    u = rng.random(n)
+    payer_pos = np.empty(n, dtype=np.int64)
+    for i in np.unique(reg_pos):
+        sel = reg_pos == i
+        payer_pos[sel] = np.searchsorted(cum[i], u[sel], side="right")
+    pct = rng.uniform(pct_range[0], pct_range[1], size=n)
+    per_row = pd.DataFrame(
+        {
+            "date_id": s_df["date_id"].to_numpy(),
+            "product_id": s_df["product_id"].to_numpy(),
+            "payer_id": pay["payer_id"].to_numpy(dtype=KEY_DTYPES["payer_id"])[payer_pos],
+            "region_id": s_df["region_id"].to_numpy(),
+            "rebate_chf": s_df["gross_sales_chf"].to_numpy() * pct,
+        },
+        columns=REBATE_COLS,
+    )
+    keys = ["product_id", "region_id", "date_id", "payer_id"]
+    out = per_row.groupby(keys, as_index=False, sort=True)["rebate_chf"].sum()
+    return out[REBATE_COLS]
+
+
+PROMO_COLS = ["date_id", "product_id", "region_id", "channel_id", "spend_chf", "touchpoints"]
+
+
+def campaign_mask(
+    series_start: np.ndarray, rate: float, length: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Flag rows that fall inside a promo campaign burst.
+
+    Rows must be ordered by series then day; `series_start[i]` is the row index where
+    row i's series begins. Each day starts a campaign with probability `rate`, and a
+    campaign stays on for `length` days (bursts may overlap and merge).
+    """
+    n = len(series_start)
+    starts = np.concatenate([[0], np.cumsum(rng.random(n) < rate)])
+    idx = np.arange(n)
+    lo = np.maximum(idx - length + 1, series_start)
+    return starts[idx + 1] - starts[lo] > 0
+
+
+def promo_frame(
+    s_df: pd.DataFrame,
+    channel_ids: np.ndarray,
+    rng: np.random.Generator,
+    campaign_rate: float = 1 / 45,
+    campaign_days: int = 14,
+) -> pd.DataFrame:
+    """Daily promo per product × region, scaled off sales units, with campaign bursts.
+
+    Each product gets one spend-per-unit and touchpoint-per-unit rate plus a campaign
+    boost; channels are drawn uniformly from `channel_ids` for every row.
+    """
+    agg = s_df.groupby(["product_id", "region_id", "date_id"], as_index=False, sort=True)[
+        "units"
+    ].sum()
+    n = len(agg)
+    pid = agg["product_id"].to_numpy()
+    rid = agg["region_id"].to_numpy()
+    units = agg["units"].to_numpy(dtype=np.float64)
+
+    products, p_pos = np.unique(pid, return_inverse=True)
+    spend_rate = rng.uniform(0.5, 1.5, size=len(products))[p_pos]
+    touch_rate = rng.uniform(0.01, 0.03, size=len(products))[p_pos]
+    boost = rng.uniform(0.5, 1.5, size=len(products))[p_pos]
+
+    new_series = np.ones(n, dtype=bool)
+    new_series[1:] = (pid[1:] != pid[:-1]) | (rid[1:] != rid[:-1])
+    series_start = np.maximum.accumulate(np.where(new_series, np.arange(n), 0))
+    lift = 1.0 + boost * campaign_mask(series_start, campaign_rate, campaign_days, rng)
+
+    return pd.DataFrame(
+        {
+            "date_id": agg["date_id"].to_numpy(),
+            "product_id": pid,
+            "region_id": rid,
+            "channel_id": rng.choice(
+                np.asarray(channel_ids, dtype=KEY_DTYPES["channel_id"]), size=n
+            ),
+            "spend_chf": (units * spend_rate * lift).round(2),
+            "touchpoints": np.maximum(1, (units * touch_rate * lift).astype(COUNT_DTYPE)),
+        },
+        columns=PROMO_COLS,
+    )
+
+
+FORECAST_COLS = [
+    "date_id",
+    "product_id",
+    "region_id",
+    "baseline_units",
+    "uplift_units",
+    "forecast_units",
+]
+
+
+def forecast_frame(
+    s_df: pd.DataFrame,
+    r_df: pd.DataFrame,
+    p_df: pd.DataFrame,
+    history: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """Baseline (lagged 4-day mean of units) + uplift from promo spend and rebate pressure.
+
+    Series are product × region, so frames chunked by product give identical results.
+    `history` (date_id, product_id, region_id, units_total) holds the days just before
+    `s_df` — e.g. the tail of an earlier load — so the rolling baseline carries over.
+    """
+    s_agg = s_df.groupby(["date_id", "product_id", "region_id"], as_index=False).agg(
+        units_total=("units", "sum"), gross_sales_chf=("gross_sales_chf", "sum")
+    )
+    r_agg = r_df.groupby(["date_id", "product_id", "region_id"], as_index=False).agg(
+        rebate_chf=("rebate_chf", "sum")
+    )
+    merged = (
+        pd.merge(s_agg, r_agg, how="left", on=["date_id", "product_id", "region_id"])
+        .fillna({"rebate_chf": 0.0})
+        .copy()
+    )
+    merged["rebate_rate"] = np.where(
+        merged["gross_sales_chf"] > 0,
+        merged["rebate_chf"] / merged["gross_sales_chf"],
+        0.0,
+    )
+    p_agg = p_df.groupby(["date_id", "product_id", "region_id"], as_index=False).agg(
+        spend_chf=("spend_chf", "sum"), touchpoints=("touchpoints", "sum")
+    )
+    m = (
+        pd.merge(merged, p_agg, how="left", on=["date_id", "product_id", "region_id"])
+        .fillna({"spend_chf": 0.0, "touchpoints": 0})
+        .sort_values(["product_id", "region_id", "date_id"])
+    )
+    if history is not None and len(history):
+        hist = compact_keys(history).assign(date_id=pd.to_datetime(history["date_id"]), _hist=True)
+        m = pd.concat([hist, m.assign(_hist=False)], ignore_index=True).sort_values(
+            ["product_id", "region_id", "date_id"]
+        )
+    m["baseline_units"] = (
+        m.groupby(["product_id", "region_id"])["units_total"]
+        .transform(lambda s: s.shift(1).rolling(4, min_periods=1).mean())
+        .fillna(0)
+    )
+    if "_hist" in m:
+        m = m[~m["_hist"].astype(bool)]
+    alpha, beta = 0.003, -0.5
+    m["uplift_units"] = (alpha * m["spend_chf"] + beta * m["rebate_rate"] * m["units_total"]).clip(
+        lower=-0.4 * m["units_total"], upper=0.5 * m["units_total"]
+    )
+    m["forecast_units"] = np.maximum(0, m["baseline_units"] + m["uplift_units"])
+    out = m[FORECAST_COLS].reset_index(drop=True)
+    units_cols = ["baseline_units", "uplift_units", "forecast_units"]
+    return out.astype(dict.fromkeys(units_cols, SMALL_FLOAT))
+
+
+INVENTORY_WINDOW = 28  # days in the reorder point's trailing demand mean
+
+INVENTORY_COLS = [
+    "date_id",
+    "product_id",
+    "region_id",
+    "demand_units",
+    "receipts_units",
+    "on_hand_units",
+    "on_order_units",
+    "reorder_point_units",
+]
+
+
+def inventory_frame(
+    s_df: pd.DataFrame,
+    rng: np.random.Generator,
+    start: pd.DataFrame | None = None,
+    history: pd.DataFrame | None = None,
+    seed: int | None = None,
+    window: int = INVENTORY_WINDOW,
+    cover_days: int = 14,
+    lead_days: tuple[int, int] = (3, 10),
+    safety_days: tuple[int, int] = (1, 4),
+    short_rate: float = 0.15,
+) -> pd.DataFrame:
+    """Daily stock per product × region under a reorder-point policy, fed by sales units.
+
+    The simulation steps through days once, with every series updated together as
+    vectors. Each day's receipts arrive first, then demand ships from stock. Demand
+    beyond on-hand is lost. Once the inventory position (on hand + on order) is at or
+    below the reorder point, an order tops it up to reorder point + `cover_days` of
+    demand.
+    - The reorder point is the trailing `window`-day mean demand × (lead + safety days).
+    - Lead and safety days are fixed per series: keyed on (seed, product_id, region_id)
+      when `seed` is given, so every run agrees on them, else drawn from `rng`.
+      Deliveries may be a day or two late.
+    - With probability `short_rate` a delivery is short-shipped, which causes stockouts.
+    An earlier load carries over through `start` (product_id, region_id, on_hand_units,
+    on_order_units), whose open orders land after the series' lead time, and `history`
+    (date_id, product_id, region_id, demand_units), its last `window` days of demand,
+    which the trailing mean picks up from.
+    """
+    agg = s_df.groupby(["product_id", "region_id", "date_id"], as_index=False, sort=True)[
+        "units"
+    ].sum()
+    first_day = agg["date_id"].min()
+    if history is not None and len(history) and len(agg):
+        hist = history.rename(columns={"demand_units": "units"})
+        hist = hist.assign(date_id=pd.to_datetime(hist["date_id"]))
+        hist = hist[hist["date_id"] < first_day]
+        agg = pd.concat([compact_keys(hist)[list(agg.columns)], agg], ignore_index=True)
+    keys, series = np.unique(
+        agg[["product_id", "region_id"]].to_numpy(dtype=np.int64), axis=0, return_inverse=True
+    )
+    series = series.ravel()
+    day_arr = agg["date_id"].to_numpy(dtype="datetime64[D]")
+    days, day_pos = np.unique(day_arr, return_inverse=True)
+    n_s, n_d = len(keys), len(days)
+    # history days only feed the trailing mean; the simulation starts at `first`
+    first = int((days < np.datetime64(first_day, "D")).sum()) if n_d else 0
+
+    demand = np.zeros((n_s, n_d), dtype=np.int64)
+    demand[series, day_pos] = agg["units"].to_numpy()
+    active = np.zeros((n_s, n_d), dtype=bool)
+    active[series, day_pos] = True
+    # trailing mean over the active days of the last `window` (today included)
+    csum = np.cumsum(demand, axis=1)
+    cact = np.cumsum(active, axis=1)
+    lag_sum = np.zeros_like(csum)
+    lag_act = np.zeros_like(cact)
+    lag_sum[:, window:] = csum[:, :-window]
+    lag_act[:, window:] = cact[:, :-window]
+    avg = (csum - lag_sum) / np.maximum(cact - lag_act, 1)
+
+    if seed is None:
+        lead = rng.integers(lead_days[0], lead_days[1] + 1, size=n_s)
+        safety = rng.integers(safety_days[0], safety_days[1] + 1, size=n_s)
+    else:
+        policy = np.array(
+            [
+                np.random.default_rng(
+                    np.random.SeedSequence(seed, spawn_key=(int(p), int(r)))
+                ).integers((lead_days[0], safety_days[0]), (lead_days[1] + 1, safety_days[1] + 1))
+                for p, r in keys
+            ]
+        ).reshape(n_s, 2)
+        lead, safety = policy[:, 0], policy[:, 1]
+    rop = np.ceil(avg * (lead + safety)[:, None]).astype(np.int64)
+    upto = rop + np.ceil(avg * cover_days).astype(np.int64)
+
+    rows = np.arange(n_s)
+    slots = lead_days[1] + 3  # ring buffer of open orders by arrival day
+    pipeline = np.zeros((n_s, slots), dtype=np.int64)
+    on_hand = np.zeros(n_s, dtype=np.int64)
+    on_order = np.zeros(n_s, dtype=np.int64)
+    started = np.zeros(n_s, dtype=bool)
+    if start is not None and len(start):
+        pos = pd.MultiIndex.from_arrays(keys.T).get_indexer(
+            pd.MultiIndex.from_frame(start[["product_id", "region_id"]].astype(np.int64))
+        )
+        found = pos >= 0
+        pos = pos[found]
+        on_hand[pos] = start["on_hand_units"].to_numpy()[found]
+        on_order[pos] = start["on_order_units"].to_numpy()[found]
+        pipeline[pos, (first + lead[pos]) % slots] = on_order[pos]
+        started[pos] = True
+
+    out = {c: np.zeros((n_s, n_d), dtype=np.int64) for c in ("receipts", "on_hand", "on_order")}
+    for t in range(first, n_d):
+        act = active[:, t]
+        fresh = act & ~started
+        on_hand[fresh] = upto[fresh, t]  # opening stock when a series goes live
+        started |= act
+
+        arriving = pipeline[:, t % slots].copy()
+        pipeline[:, t % slots] = 0
+        short = rng.random(n_s) < short_rate
+        fill = np.where(short, rng.uniform(0.2, 0.9, size=n_s), 1.0)
+        received = np.floor(arriving * fill).astype(np.int64)
+        on_order -= arriving
+        on_hand += received
+
+        on_hand -= np.minimum(on_hand, demand[:, t])
+        position = on_hand + on_order
+        order = np.where(act & (position <= rop[:, t]), upto[:, t] - position, 0)
+        late = rng.integers(0, 3, size=n_s) * (rng.random(n_s) < 0.1)
+        pipeline[rows, (t + lead + late) % slots] += order
+        on_order += order
+
+        out["receipts"][:, t] = received
+        out["on_hand"][:, t] = on_hand
+        out["on_order"][:, t] = on_order
+
+    s_idx, d_idx = np.nonzero(active[:, first:])
+    d_idx += first
+    return pd.DataFrame(
+        {
+            "date_id": days[d_idx].astype("datetime64[ns]"),
+            "product_id": keys[s_idx, 0].astype(KEY_DTYPES["product_id"]),
+            "region_id": keys[s_idx, 1].astype(KEY_DTYPES["region_id"]),
+            "demand_units": demand[s_idx, d_idx].astype(COUNT_DTYPE),
+            "receipts_units": out["receipts"][s_idx, d_idx].astype(COUNT_DTYPE),
+            "on_hand_units": out["on_hand"][s_idx, d_idx].astype(COUNT_DTYPE),
+            "on_order_units": out["on_order"][s_idx, d_idx].astype(COUNT_DTYPE),
+            "reorder_point_units": rop[s_idx, d_idx].astype(COUNT_DTYPE),
+        },
+        columns=INVENTORY_COLS,
+    )
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from generate import load_sources, source_split
+
+
+def test_sources_must_feed_every_raw_table():
+    # crm only sends sales_raw and promo_raw
+    with pytest.raises(ValueError, match="rebates_raw, forecast_raw"):
+        load_sources(["crm"])
+    assert [s["name"] for s in load_sources(["crm", "fin"])] == ["crm", "fin"]
+
+
+def test_drift_rounds_integer_columns():
+    # ±2% drift on 10 units must round back to 10 almost always; truncating toward zero
+    # would turn every scaled-down copy into 9 and drag the mean to about 9.5.
+    n = 2000
+    df = pd.DataFrame(
+        {
+            "date_id": pd.Timestamp("2024-01-01"),
+            "product_id": 1,
+            "region_id": 1,
+            "channel_id": 1,
+            "units": np.full(n, 10, dtype=np.int32),
+            "list_price_chf": 200.0,
+            "gross_sales_chf": 2000.0,
+        }
+    )
+    sources = [
+        {"name": "erp", "weight": 1.0},
+        {"name": "crm", "weight": 1.0, "overlap": 1.0, "drift": 0.02},
+    ]
+    split = source_split(df, "rps_raw.sales_raw", sources, np.random.default_rng(0))
+    crm = {src["name"]: part for src, part in split}["crm"]["units"]
+    assert len(crm) == n
+    assert crm.dtype == df["units"].dtype
+    assert abs(crm.mean() - 10) < 0.05
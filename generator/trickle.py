@@ -0,0 +1,293 @@
+# generator/trickle.py
+# Continuous raw ingest: messy rows into rps_raw.* at a target rate, in micro-batches.
+#
+#   python trickle.py --rate 2000                  # until Ctrl-C
+#   python trickle.py --rate 20000 --seconds 300 --connections 4 --report trickle.json
+import argparse
+import os
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count, zip_longest
+
+import numpy as np
+import pandas as pd
+from psycopg2.pool import ThreadedConnectionPool
+
+from generate import (
+    DB,
+    HOST,
+    PORT,
+    PWD,
+    RAW_TABLES,
+    SCALE,
+    SEED,
+    TZ,
+    USER,
+    WRITE_RAW,
+    connect,
+    connect_engine,
+    frame_jobs,
+    load_scale,
+    product_frames,
+    read_dims,
+    read_window,
+    sales_tail,
+)
+from instrument import Recorder, print_report, save_report, write_report
+from loader import copy_frame
+
+TRICKLE_RATE = float(os.getenv("TRICKLE_RATE", "1000"))  # rows/s over all raw tables
+TRICKLE_BATCH_ROWS = int(os.getenv("TRICKLE_BATCH_ROWS", "500"))
+TRICKLE_CONNECTIONS = int(os.getenv("TRICKLE_CONNECTIONS", "2"))
+TRICKLE_SECONDS = float(os.getenv("TRICKLE_SECONDS", "0"))  # 0 = until interrupted
+TRICKLE_DAYS = int(os.getenv("TRICKLE_DAYS", "7"))  # trailing days the rows are drawn for
+
+
+def trickle_state(engine, dims: dict) -> dict:
+    """Trend window and sales tail of the loaded data, so trickled days continue its series."""
+    window = read_window(engine)
+    if not window:
+        return {}
+    first = dims["dates"]["date_id"].iloc[-TRICKLE_DAYS]
+    return {**window, "history": sales_tail(engine, first - pd.Timedelta(days=1))}
+
+
+def raw_batches(
+    dims: dict, profile: dict, seed: int, batch_rows: int, state: dict | None = None
+) -> Iterator[tuple[str, pd.DataFrame]]:
+    """Endless (table, micro-batch) stream of messy raw rows for the last TRICKLE_DAYS days.
+
+    The context (prices, trend horizon, `state` from trickle_state) is the full load's;
+    only the per-product noise seeds change from pass to pass, so re-sent days arrive as
+    new, conflicting copies — the late-arriving data incremental staging has to absorb.
+    Tables are interleaved batch by batch, as independent feeds would be.
+    """
+    ctx, jobs = frame_jobs(dims, profile, seed)
+    ctx["days"] = ctx["days"].iloc[-TRICKLE_DAYS:]
+    ctx.update(state or {})
+    products = [p for p, _ in jobs]
+    if not products:
+        raise ValueError("No products to trickle rows for; load dimensions first")
+    for cycle in count():
+        sent = False
+        seeds = np.random.SeedSequence([seed, cycle]).spawn(len(products))
+        for prod, child in zip(products, seeds, strict=True):
+            frames = product_frames(ctx, prod, child)
+            slices = [
+                [(t, df.iloc[i : i + batch_rows]) for i in range(0, len(df), batch_rows)]
+                for t, df in ((t, frames[t]) for t in RAW_TABLES)
+            ]
+            for round_ in zip_longest(*slices):
+                for batch in round_:
+                    if batch is not None:
+                        sent = True
+                        yield batch
+        if not sent:
+            raise ValueError(f"No raw rows in the last {TRICKLE_DAYS} days to trickle")
+
+
+class Trickle:
+    """Send micro-batches at `rate` rows/s over a pool of `connections`.
+
+    Batch k is due at start + rows_sent / rate; when COPYs can't keep up, batches go out
+    late instead of being dropped, so `lag` shows how far behind the target we are.
+    At most 2 × connections batches are in flight, which bounds memory and makes a slow
+    database push back on the schedule. Latency is per COPY, commit included.
+    """
+
+    def __init__(self, pool: ThreadedConnectionPool, connections: int, rate: float):
+        self.pool = pool
+        self.connections = connections
+        self.rate = rate
+        self.latency: list[float] = []
+        self.lag: list[float] = []
+        self.stats: list[dict] = []
+        self._executor = ThreadPoolExecutor(max_workers=connections)
+
+    def _copy(self, table: str, df: pd.DataFrame) -> dict:
+        conn = self.pool.getconn()
+        try:
+            conn.autocommit = True
+            # raw tables are all TEXT: CSV, and no per-batch catalog lookup for "auto"
+            return copy_frame(conn, df, table, fmt="csv", quiet=True)
+        finally:
+            self.pool.putconn(conn)
+
+    def _collect(self, future):
+        st = future.result()
+        self.stats.append(st)
+        self.latency.append(st["seconds"])
+
+    def run(self, batches: Iterator[tuple[str, pd.DataFrame]], seconds: float, every: float):
+        start = last_print = time.perf_counter()
+        pending: deque = deque()
+        queued = 0
+        try:
+            for batch in batches:
+                if batch is None:  # producer stalled: keep the --seconds limit
+                    if seconds and time.perf_counter() - start >= seconds:
+                        break
+                    continue
+                table, df = batch
+                due = start + queued / self.rate
+                now = time.perf_counter()
+                if due > now:
+                    time.sleep(due - now)
+                self.lag.append(max(0.0, now - due))
+                pending.append(self._executor.submit(self._copy, table, df))
+                queued += len(df)
+                while pending and (pending[0].done() or len(pending) >= 2 * self.connections):
+                    self._collect(pending.popleft())
+                now = time.perf_counter()
+                if every and now - last_print >= every:
+                    self.progress(now - start)
+                    last_print = now
+                if seconds and now - start >= seconds:
+                    break
+        except KeyboardInterrupt:
+            print("Interrupted, draining in-flight batches")
+        while pending:
+            self._collect(pending.popleft())
+        self._executor.shutdown()
+        return time.perf_counter() - start
+
+    def progress(self, elapsed: float):
+        rows = sum(st["rows"] for st in self.stats)
+        p95 = np.percentile(self.latency, 95) * 1e3 if self.latency else 0.0
+        print(
+            f"{elapsed:8.1f}s  {rows:>10,} rows  {rows / elapsed:>9,.0f} rows/s "
+            f"(target {self.rate:,.0f})  p95 {p95:.1f} ms  lag {self.lag[-1]:.2f}s"
+        )
+
+    def summary(self, elapsed: float) -> dict:
+        rows = sum(st["rows"] for st in self.stats)
+        lat = np.array(self.latency or [0.0]) * 1e3
+        latency = {f"p{q}": round(float(np.percentile(lat, q)), 2) for q in (50, 90, 95, 99)}
+        return {
+            "target_rows_per_s": self.rate,
+            "rows": rows,
+            "batches": len(self.stats),
+            "seconds": round(elapsed, 3),
+            "rows_per_s": round(rows / max(elapsed, 1e-9), 1),
+            "latency_ms": {**latency, "max": round(float(lat.max()), 2)},
+            "max_lag_s": round(max(self.lag, default=0.0), 3),
+        }
+
+
+_DONE = object()  # end-of-stream marker on the read-ahead queue
+
+
+def _produce(items: Iterator, ahead: queue.Queue, stop: threading.Event):
+    try:
+        for item in items:
+            while not stop.is_set():
+                try:
+                    ahead.put(item, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+            if stop.is_set():
+                return
+    except Exception as exc:  # surface it on the sending side
+        ahead.put(exc)
+    else:
+        ahead.put(_DONE)
+
+
+def read_ahead(items: Iterator, size: int, stop: threading.Event, idle: float = 0.5) -> Iterator:
+    """Pull `items` on a daemon thread, up to `size` ahead, so synthesis doesn't stall sends.
+
+    Yields None whenever nothing arrives for `idle` seconds, so the consumer can still
+    check its time limit. The thread exits once `stop` is set; an exception it hits is
+    re-raised to the consumer, and the stream ends when `items` does.
+    """
+    ahead: queue.Queue = queue.Queue(maxsize=size)
+    threading.Thread(target=_produce, args=(items, ahead, stop), daemon=True).start()
+    while True:
+        try:
+            item = ahead.get(timeout=idle)
+        except queue.Empty:
+            yield None
+            continue
+        if item is _DONE:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Trickle messy rows into rps_raw.* at a rate.")
+    parser.add_argument("--rate", type=float, default=TRICKLE_RATE, help="target rows/s")
+    parser.add_argument("--batch-rows", type=int, default=TRICKLE_BATCH_ROWS)
+    parser.add_argument("--connections", type=int, default=TRICKLE_CONNECTIONS)
+    parser.add_argument(
+        "--seconds", type=float, default=TRICKLE_SECONDS, help="stop after this long (0 = never)"
+    )
+    parser.add_argument("--every", type=float, default=10.0, help="progress line interval (s)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--report", help="write the JSON run report here ('-' = stdout)")
+    parser.add_argument("--save", action="store_true", help="also record it in rps_core.load_runs")
+    args = parser.parse_args(argv)
+    if args.rate <= 0 or args.batch_rows <= 0:
+        parser.error("--rate and --batch-rows must be positive")
+    if not WRITE_RAW:
+        parser.error("trickle only writes rps_raw.*; unset WRITE_RAW=0")
+
+    profile = load_scale(SCALE)
+    engine = connect_engine()
+    dims = read_dims(engine)
+    state = trickle_state(engine, dims)
+    stop = threading.Event()
+    batches = read_ahead(
+        raw_batches(dims, profile, args.seed, args.batch_rows, state), 4 * args.connections, stop
+    )
+    pool = ThreadedConnectionPool(
+        args.connections,
+        args.connections,
+        dbname=DB,
+        user=USER,
+        password=PWD,
+        host=HOST,
+        port=PORT,
+        options=f"-c timezone={TZ} -c search_path=rps_core,public",
+    )
+    print(
+        f"Trickling into {', '.join(RAW_TABLES)} at {args.rate:,.0f} rows/s "
+        f"({args.batch_rows} rows/batch, {args.connections} connection(s))"
+    )
+    recorder = Recorder()
+    trickle = Trickle(pool, args.connections, args.rate)
+    try:
+        elapsed = trickle.run(batches, args.seconds, args.every)
+    finally:
+        stop.set()
+        pool.closeall()
+
+    summary = trickle.summary(elapsed)
+    recorder.add_copies(trickle.stats)
+    report = recorder.report(
+        scale=SCALE, mode="trickle", load_connections=args.connections, seed=args.seed, **summary
+    )
+    print_report(report)
+    lat = summary["latency_ms"]
+    print(
+        f"Trickle: {summary['rows']:,} rows in {summary['batches']} batches, "
+        f"{summary['rows_per_s']:,.0f} rows/s (target {args.rate:,.0f}); latency "
+        f"p50 {lat['p50']} / p95 {lat['p95']} / p99 {lat['p99']} ms; "
+        f"max lag {summary['max_lag_s']}s"
+    )
+    if args.report:
+        write_report(report, args.report)
+    if args.save:
+        conn = connect()
+        save_report(conn, report)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -93,51 +93,39 @@ ORDER BY month_start, p.brand, r.canton;"""
 
 with tabs[3]:
     st.subheader("4) Stockout flag and Days of Supply")
-    sql = """WITH daily_demand AS (
+    sql = """WITH inv AS (
+    -- Precomputed by the generator: rps_core.fct_inventory (product × region × day)
     SELECT
-        d.date_id,
-        d.date_actual,
-        s.product_id,
-        SUM(s.units) AS units
-    FROM rps_core.fct_sales AS s
-    JOIN rps_core.dim_date  AS d ON s.date_id = d.date_id
-    GROUP BY 1,2,3
-    ),
-    rolling AS (
-    SELECT
-        date_actual,
-        product_id,
-        units,
-        AVG(units) OVER (
-        PARTITION BY product_id
-        ORDER BY date_actual
+        i.date_id,
+        p.brand,
+        r.canton,
+        i.demand_units,
+        i.on_hand_units,
+        i.reorder_point_units,
+        AVG(i.demand_units) OVER (
+        PARTITION BY i.product_id, i.region_id
+        ORDER BY i.date_id
         ROWS BETWEEN 6 PRECEDING AND CURRENT ROW
         ) AS avg_7d_units
-    FROM daily_demand
-    ),
-    inv AS (
-    -- Fake inventory series: start at 2,000 and decay by demand; reorder point at 300
-    SELECT
-        r.date_actual,
-        r.product_id,
-        GREATEST(0, 2000
-        - SUM(r.units) OVER (PARTITION BY r.product_id ORDER BY r.date_actual)) AS inventory_on_hand,
-        300::int AS reorder_point,
-        r.avg_7d_units
-    FROM rolling r
+    FROM rps_core.fct_inventory AS i
+    JOIN rps_core.dim_product   AS p ON i.product_id = p.product_id
+    JOIN rps_core.dim_region    AS r ON i.region_id = r.region_id
+    WHERE i.date_id >= (SELECT MAX(date_id) FROM rps_core.fct_inventory) - 90
     )
     SELECT
-    date_actual,
-    product_id,
-    inventory_on_hand,
-    reorder_point,
+    date_id,
+    brand,
+    canton,
+    on_hand_units,
+    reorder_point_units,
     avg_7d_units,
-    CASE WHEN inventory_on_hand <= reorder_point THEN 1 ELSE 0 END AS stockout_flag,
+    CASE WHEN on_hand_units = 0 THEN 1 ELSE 0 END                    AS stockout_flag,
+    CASE WHEN on_hand_units <= reorder_point_units THEN 1 ELSE 0 END AS below_rop_flag,
     CASE
         WHEN COALESCE(avg_7d_units,0) = 0 THEN NULL
-        ELSE inventory_on_hand / avg_7d_units
+        ELSE on_hand_units / avg_7d_units
     END AS days_of_supply
     FROM inv
-    ORDER BY product_id, date_actual;"""
+    ORDER BY stockout_flag DESC, days_of_supply NULLS LAST, date_id DESC;"""
     st.code(sql, language="sql")
     st.dataframe(read_sql_df(sql).head(100), use_container_width=True)